@@ -3,6 +3,9 @@ from typing import TypeVar
 
 T = TypeVar("T")
 
+# Marks the end of the keys in search_many, since any value (even None) can be a key.
+_END = object()
+
 def binary_search(l: list[T], item: T, key = lambda x:x, is_insert : bool = False) -> int:
     """
     Utilise the binary search algorithm to find the index where a particular element would be stored.
@@ -15,32 +18,135 @@ def binary_search(l: list[T], item: T, key = lambda x:x, is_insert : bool = Fals
     Best Case Complexity: O(1), when middle index contains item.
     Worst Case Complexity: O(log(N)), where N is the length of l.
     """
-    return _binary_search_aux(l, item, 0, len(l), key, is_insert = is_insert)
+    return _binary_search_aux(l, key(item), 0, len(l), key, is_insert = is_insert)
+
+def binary_search_keys(keys: list, item_key, is_insert : bool = False) -> int:
+    """
+    Binary search over a list of precomputed keys, for an item whose key is item_key.
+    Same results as binary_search, without calling a key function at all.
+
+    :complexity:
+    Best Case Complexity: O(1), when middle index contains item.
+    Worst Case Complexity: O(log(N)), where N is the length of keys.
+    """
+    return _binary_search_aux(keys, item_key, 0, len(keys), lambda x:x, is_insert = is_insert)
 
-def _binary_search_aux(l: list[T], item: T, lo: int, hi: int , key = lambda x:x, is_insert : bool = False) -> int:
+def _binary_search_aux(l: list[T], item_key, lo: int, hi: int , key = lambda x:x, is_insert : bool = False) -> int:
     """
-    Auxilliary method used by binary search.
+    Auxilliary method used by binary search. Iterative: one loop step per halving.
+    item_key: key of the searched item, computed once by the caller.
     lo: smallest index where the return value could be.
     hi: largest index where the return value could be.
     """
-    if lo == hi:
-        if is_insert == True:
-            return lo
+    while lo < hi:
+        mid = (hi + lo) // 2
+        mid_key = key(l[mid])
+        if mid_key > item_key:
+            # Item would be before mid
+            hi = mid
+        elif mid_key < item_key:
+            # Item would be after mid
+            lo = mid + 1
+        elif mid_key == item_key:
+            return mid
+        else:
+            raise ValueError(f"Comparison operator poorly implemented {item_key} and {mid_key} cannot be compared.")
+    if is_insert == True:
+        return lo
+    raise KeyError("Item" ,item_key, "does not exist")
+
+def bisect_left(l: list[T], item_key, key = lambda x:x, lo: int = 0, hi: int|None = None) -> int:
+    """
+    Return the first index in l[lo:hi] whose key is not smaller than item_key
+    (where item_key would be inserted before any equal keys).
+
+    :complexity: Best/Worst Case O(log(N) * key), where N is hi - lo.
+    """
+    if hi is None:
+        hi = len(l)
+    while lo < hi:
+        mid = (hi + lo) // 2
+        if key(l[mid]) < item_key:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+def bisect_right(l: list[T], item_key, key = lambda x:x, lo: int = 0, hi: int|None = None) -> int:
+    """
+    Return the first index in l[lo:hi] whose key is greater than item_key
+    (where item_key would be inserted after any equal keys).
+
+    :complexity: Best/Worst Case O(log(N) * key), where N is hi - lo.
+    """
+    if hi is None:
+        hi = len(l)
+    while lo < hi:
+        mid = (hi + lo) // 2
+        if item_key < key(l[mid]):
+            hi = mid
         else:
-            raise KeyError("Item" ,item, "does not exist")
-    mid = (hi + lo) // 2
-    if key(l[mid]) > key(item):
-        # Item would be before mid
-        return _binary_search_aux(l, item, lo, mid, key, is_insert)
-    elif key(l[mid]) < key(item):
-        # Item would be after mid
-        return _binary_search_aux(l, item, mid+1, hi, key, is_insert)
-    elif key(l[mid]) == key(item):
-        return mid
-    raise ValueError(f"Comparison operator poorly implemented {item} and {l[mid]} cannot be compared.")
+            lo = mid + 1
+    return lo
+
+def find(l: list[T], item: T, key = lambda x:x) -> int|None:
+    """
+    Non-raising lookup: the index of the first element with the same key as item, or None.
+
+    :complexity: Best/Worst Case O(log(N) * key), where N is the length of l.
+    """
+    item_key = key(item)
+    index = bisect_left(l, item_key, key)
+    if index < len(l) and key(l[index]) == item_key:
+        return index
+    return None
+
+def search_many(sorted_keys, queries: list, length: int|None = None, find_key = None) -> list[int|None]:
+    """
+    Look up a sorted batch of query keys in a sorted sequence of keys.
+    Returns, for every query, the index of the first equal key in sorted_keys, or None.
+
+    Depending on the sizes this is either a single merge-like pass over both,
+    or one lookup per query, whichever is cheaper.
+
+    sorted_keys: a sorted list of keys, or any iterable over sorted keys (such as
+        BlockSortedList.keys()), which is only iterated if the merge-like pass is taken.
+    length: the number of keys, needed when sorted_keys is not a list.
+    find_key: a function giving a query's index in sorted_keys (or None), used for the
+        per-query lookups; by default each query bisects the list from where the previous one ended.
+
+    :pre: Both sorted_keys and queries are sorted.
+    :complexity: Best/Worst Case O(min(N + Q, Q * log(N))), where N is the number of keys and Q = len(queries),
+        with a find_key of O(log(N)).
+    """
+    n = len(sorted_keys) if length is None else length
+
+    if len(queries) * max(n, 1).bit_length() < n + len(queries):
+        if find_key is not None:
+            return [find_key(query) for query in queries]
+        result : list[int|None] = []
+        index = 0
+        for query in queries:
+            index = bisect_left(sorted_keys, query, lo = index)
+            result.append(index if index < n and sorted_keys[index] == query else None)
+        return result
+
+    result = []
+    keys = iter(sorted_keys)
+    index = 0
+    current = next(keys, _END)
+    for query in queries:
+        while current is not _END and current < query:
+            current = next(keys, _END)
+            index += 1
+        result.append(index if current is not _END and current == query else None)
+    return result
 
 """
 Changes made:
 - added parameters - key (lambda function) and is_insert (boolean)
 - raised KeyError
-"""
\ No newline at end of file
+- keys are computed once per probe (binary_search_keys searches precomputed keys)
+- made the search iterative, added bisect_left/bisect_right, find and search_many
+- search_many also takes an iterable of keys and a lookup function (used by MountainOrganiser.positions)
+"""
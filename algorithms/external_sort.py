@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import heapq
+import json
+import tempfile
+from typing import Callable, Iterable, Iterator, TypeVar
+
+from algorithms.mergesort import natural_mergesort
+
+T = TypeVar("T")
+
+def merge_k(iterables: list[Iterable[T]], key=lambda x:x) -> Iterator[T]:
+    """
+    Merges any number of sorted iterables into one sorted stream, using a heap of their heads.
+
+    Each element's key is computed exactly once. The merge is stable: equal keys
+    come out in the order of the iterables they came from, then in their own order.
+
+    :pre: Every iterable is sorted by key.
+    :complexity: Best/Worst Case O(n * log(k) * comp(key)), n = total number of elements, k = len(iterables)
+    """
+    iterators = [iter(iterable) for iterable in iterables]
+    # (key, source index, element): keys tie-break on the source index, elements are never compared.
+    heap = []
+    for index, iterator in enumerate(iterators):
+        for item in iterator:
+            heap.append((key(item), index, item))
+            break
+    heapq.heapify(heap)
+
+    while len(heap) > 0:
+        _, index, item = heap[0]
+        yield item
+        for next_item in iterators[index]:
+            heapq.heapreplace(heap, (key(next_item), index, next_item))
+            break
+        else:
+            heapq.heappop(heap)
+
+def external_mergesort(items: Iterable[T], key=lambda x:x, run_size: int = 100000, fan_in: int = 64,
+                       encode: Callable[[T], str] = json.dumps, decode: Callable[[str], T] = json.loads,
+                       directory: str|None = None) -> Iterator[T]:
+    """
+    Sorts a stream that may not fit in memory, yielding the sorted elements one by one.
+
+    Elements are read run_size at a time, each run is sorted in memory and spilled to a
+    temporary file (one encoded element per line), then the runs are streamed back through
+    merge_k. When there are more than fan_in runs, groups of fan_in runs are first merged
+    into longer runs, so at most fan_in files are read at once. Temporary files are removed
+    once the result has been consumed (or the generator is closed).
+
+    encode must not produce newlines, and decode(encode(x)) must give back an equivalent element.
+    The sort is stable. When the stream fits in a single run the original elements are yielded;
+    otherwise the decoded copies are.
+
+    :complexity: Best/Worst Case O(n * log(n) * comp(key)) time, O(run_size + fan_in) memory,
+                 plus O(n * log_fan_in(n / run_size)) elements written to and read from disk.
+    """
+    runs = []
+    try:
+        buffer = []
+        for item in items:
+            buffer.append(item)
+            if len(buffer) >= run_size:
+                runs.append(_spill(natural_mergesort(buffer, key=key), encode, directory))
+                buffer = []
+
+        if len(runs) == 0:
+            # Everything fitted in one run: no need to touch the disk.
+            yield from natural_mergesort(buffer, key=key)
+            return
+
+        if len(buffer) > 0:
+            runs.append(_spill(natural_mergesort(buffer, key=key), encode, directory))
+            buffer = []
+
+        while len(runs) > fan_in:
+            merged_runs = []
+            for start in range(0, len(runs), fan_in):
+                group = runs[start:start + fan_in]
+                merged_runs.append(_spill(merge_k([_read_run(run, decode) for run in group], key=key), encode, directory))
+                for run in group:
+                    run.close()
+            runs = merged_runs
+
+        yield from merge_k([_read_run(run, decode) for run in runs], key=key)
+    finally:
+        for run in runs:
+            run.close()
+
+def _spill(items: Iterable[T], encode: Callable[[T], str], directory: str|None):
+    """
+    Writes a sorted run to a new temporary file, one encoded element per line.
+    :complexity: O(n), n = number of elements in the run
+    """
+    run = tempfile.TemporaryFile(mode="w+", encoding="utf-8", dir=directory)
+    for item in items:
+        run.write(encode(item))
+        run.write("\n")
+    run.seek(0)
+    return run
+
+def _read_run(run, decode: Callable[[str], T]) -> Iterator[T]:
+    """
+    Streams the elements of a spilled run back.
+    :complexity: O(1) per element
+    """
+    for line in run:
+        yield decode(line.rstrip("\n"))
@@ -9,6 +9,7 @@ def merge(l1: list[T], l2: list[T], key=lambda x:x) -> list[T]:
     containing all elements from the smaller lists.
 
     The `key` kwarg allows you to define a custom sorting order.
+    Each element's key is computed exactly once.
 
     :pre: Both l1 and l2 are sorted, and contain comparable elements.
     :complexity: Best/Worst Case O(n * comp(T)), n = len(l1)+len(l2)
@@ -17,30 +18,177 @@ def merge(l1: list[T], l2: list[T], key=lambda x:x) -> list[T]:
     new_list = []
     cur_left = 0
     cur_right = 0
+    if len(l1) > 0 and len(l2) > 0:
+        left_key = key(l1[0])
+        right_key = key(l2[0])
     while cur_left < len(l1) and cur_right < len(l2):
-        if key(l1[cur_left]) <= key(l2[cur_right]):
+        if left_key <= right_key:
             new_list.append(l1[cur_left])
             cur_left += 1
+            if cur_left < len(l1):
+                left_key = key(l1[cur_left])
         else:
             new_list.append(l2[cur_right])
             cur_right += 1
+            if cur_right < len(l2):
+                right_key = key(l2[cur_right])
     new_list += l1[cur_left:]
     new_list += l2[cur_right:]
     return new_list
 
+def merge_keyed(l1: list[T], keys1: list, l2: list[T], keys2: list) -> tuple[list[T], list]:
+    """
+    Merges two sorted lists whose keys are already computed.
+    keys1[i] is the key of l1[i], and likewise for l2.
+
+    :pre: Both l1 and l2 are sorted by their keys.
+    :complexity: Best/Worst Case O(n * comp(key)), n = len(l1)+len(l2)
+    :returns: The sorted list and its keys.
+    """
+    new_list = []
+    new_keys = []
+    cur_left = 0
+    cur_right = 0
+    while cur_left < len(l1) and cur_right < len(l2):
+        if keys1[cur_left] <= keys2[cur_right]:
+            new_list.append(l1[cur_left])
+            new_keys.append(keys1[cur_left])
+            cur_left += 1
+        else:
+            new_list.append(l2[cur_right])
+            new_keys.append(keys2[cur_right])
+            cur_right += 1
+    new_list += l1[cur_left:]
+    new_keys += keys1[cur_left:]
+    new_list += l2[cur_right:]
+    new_keys += keys2[cur_right:]
+    return new_list, new_keys
+
 def mergesort(l: list[T], key=lambda x:x) -> list[T]:
     """
     Sort a list using the mergesort operation.
+    Each element's key is computed exactly once (see mergesort_keyed).
     :complexity: Best/Worst Case O(NlogN * comp(T))
     """
+    return mergesort_keyed(l, key=key)[0]
+
+def mergesort_keyed(l: list[T], key=lambda x:x) -> tuple[list[T], list]:
+    """
+    Sort a list using decorate-sort-undecorate:
+    compute every key once, then mergesort the keys alongside the elements.
+    :complexity: Best/Worst Case O(N * key + NlogN * comp(key))
+    :returns: The sorted list and its keys, in the same order.
+    """
+    return _mergesort_aux(l, [key(x) for x in l])
+
+def _mergesort_aux(l: list[T], keys: list) -> tuple[list[T], list]:
+    """
+    Auxilliary method used by mergesort_keyed.
+    keys[i] is the key of l[i].
+    """
     if len(l) <= 1:
-        return l
+        return l, keys
     break_index = (len(l)+1) // 2
-    l1 = mergesort(l[:break_index] , key = key)
-    l2 = mergesort(l[break_index:] , key = key)
-    return merge(l1, l2, key=key)
+    l1, keys1 = _mergesort_aux(l[:break_index], keys[:break_index])
+    l2, keys2 = _mergesort_aux(l[break_index:], keys[break_index:])
+    return merge_keyed(l1, keys1, l2, keys2)
+
+def natural_mergesort(l: list[T], key=lambda x:x) -> list[T]:
+    """
+    Sort a list using an iterative, bottom-up natural mergesort (see natural_mergesort_keyed).
+    :complexity: Best Case O(N * key), when l is already sorted (or reverse sorted).
+                 Worst Case O(N * key + NlogN * comp(key))
+    """
+    return natural_mergesort_keyed(l, key=key)[0]
+
+def natural_mergesort_keyed(l: list[T], key=lambda x:x) -> tuple[list[T], list]:
+    """
+    Sort a list using an iterative, bottom-up natural mergesort.
+
+    Keys are computed once per element. The list is first cut into runs that are
+    already sorted (strictly descending runs are reversed in place, which keeps the
+    sort stable), then neighbouring runs are merged pass after pass, alternating
+    between the list and a single auxiliary buffer. No slices are taken.
+
+    :complexity: Best Case O(N * key), when l is already sorted (or reverse sorted), i.e. one run.
+                 Worst Case O(N * key + Nlog(R) * comp(key)), where R is the number of runs (at most N).
+    :returns: The sorted list and its keys, in the same order.
+    """
+    n = len(l)
+    items = list(l)
+    keys = [key(x) for x in items]
+    if n <= 1:
+        return items, keys
+
+    # Run detection: bounds[i] is where the i-th run starts, the last entry is n.
+    bounds = [0]
+    start = 0
+    while start < n:
+        end = start + 1
+        if end < n and keys[end] < keys[start]:
+            while end < n and keys[end] < keys[end-1]:
+                end += 1
+            left, right = start, end - 1
+            while left < right:
+                items[left], items[right] = items[right], items[left]
+                keys[left], keys[right] = keys[right], keys[left]
+                left += 1
+                right -= 1
+        else:
+            while end < n and keys[end] >= keys[end-1]:
+                end += 1
+        bounds.append(end)
+        start = end
+
+    src_items, src_keys = items, keys
+    dst_items, dst_keys = [None] * n, [None] * n
+
+    while len(bounds) > 2:
+        new_bounds = [0]
+        for i in range(0, len(bounds) - 1, 2):
+            lo = bounds[i]
+            mid = bounds[i+1]
+            hi = bounds[i+2] if i + 2 < len(bounds) else mid
+            _merge_runs(src_items, src_keys, dst_items, dst_keys, lo, mid, hi)
+            new_bounds.append(hi)
+        bounds = new_bounds
+        src_items, dst_items = dst_items, src_items
+        src_keys, dst_keys = dst_keys, src_keys
+
+    return src_items, src_keys
+
+def _merge_runs(src_items: list[T], src_keys: list, dst_items: list[T], dst_keys: list, lo: int, mid: int, hi: int) -> None:
+    """
+    Merges the sorted runs src[lo:mid] and src[mid:hi] into dst[lo:hi].
+    :complexity: Best/Worst Case O((hi - lo) * comp(key))
+    """
+    cur_left = lo
+    cur_right = mid
+    out = lo
+    while cur_left < mid and cur_right < hi:
+        if src_keys[cur_left] <= src_keys[cur_right]:
+            dst_items[out] = src_items[cur_left]
+            dst_keys[out] = src_keys[cur_left]
+            cur_left += 1
+        else:
+            dst_items[out] = src_items[cur_right]
+            dst_keys[out] = src_keys[cur_right]
+            cur_right += 1
+        out += 1
+    while cur_left < mid:
+        dst_items[out] = src_items[cur_left]
+        dst_keys[out] = src_keys[cur_left]
+        cur_left += 1
+        out += 1
+    while cur_right < hi:
+        dst_items[out] = src_items[cur_right]
+        dst_keys[out] = src_keys[cur_right]
+        cur_right += 1
+        out += 1
 
 """
 Changes made:
 - added parameters in mergesort - key (lambda function)
+- keys are computed once per element (merge_keyed, mergesort_keyed)
+- added an iterative natural mergesort (natural_mergesort, natural_mergesort_keyed)
 """
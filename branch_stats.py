@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable
+
+from mountain import Mountain
+from trail import Trail, TrailSeries
+
+
+@dataclass(slots=True, frozen=True)
+class BranchStats:
+    """
+    Aggregates of everything on a trail (e.g. a branch handed to select_branch).
+
+    mountain_count, total_length and min_difficulty cover every mountain on the trail,
+    whichever way its splits go. best_score is the best total score of a single path
+    through the trail, under the score of the BranchMemo that computed it.
+    """
+
+    mountain_count: int
+    total_length: int
+    min_difficulty: int|None
+    best_score: float
+
+
+class BranchMemo:
+
+    """
+    Memo table of BranchStats for trail nodes, computed once bottom-up and then served in O(1).
+
+    A single memo can be shared by every walker on a trail, so lookahead personalities never
+    re-walk a subtree. Entries are keyed by node identity: after editing a trail, call clear().
+    """
+
+    def __init__(self, score: Callable[[Mountain], float] = lambda m: m.difficulty_level, maximise: bool = False) -> None:
+
+        """
+        defining the magic method : __init__
+        - This initialises the memo table and the path objective used for best_score
+
+        Args:
+        - self
+        - score - function giving the score of one mountain, summed along a path
+        - maximise - bool, whether the best path has the highest (True) or lowest (False) score
+
+        Raises:
+        - None
+
+        Returns:
+        - None
+
+        Complexity:
+        - Worst case: O(1)
+        - Best case: O(1)
+        """
+
+        self.score = score
+        self.maximise = maximise
+        # id(node) -> (node, stats). The node is kept so its id cannot be reused.
+        self._table : dict[int, tuple[Trail, BranchStats]] = {}
+
+
+    def __len__(self) -> int:
+
+        """
+        Returns the number of memoised trail nodes
+
+        Complexity:
+        - Worst case: O(1)
+        - Best case: O(1)
+        """
+
+        return len(self._table)
+
+
+    def stats(self, trail: Trail) -> BranchStats:
+
+        """
+        - Returns the aggregates of the trail, computing (bottom-up) only the nodes not memoised yet
+
+        Args:
+        - self
+        - trail - of Trail class
+
+        Raises:
+        - None
+
+        Returns:
+        - BranchStats
+
+        Complexity:
+        - Worst case: O(N) , where N is the number of nodes not memoised yet
+        - Best case: O(1) , when the trail is already memoised
+        """
+
+        entry = self._table.get(id(trail))
+        if entry is not None:
+            return entry[1]
+
+        self.build(trail)
+        return self._table[id(trail)][1]
+
+
+    def build(self, trail: Trail) -> None:
+
+        """
+        - Memoises the aggregates of every node of the trail, children before parents
+
+        Args:
+        - self
+        - trail - of Trail class
+
+        Raises:
+        - None
+
+        Returns:
+        - None
+
+        Complexity:
+        - Worst case: O(N) , where N is the number of nodes not memoised yet
+        - Best case: O(1) , when the trail is already memoised
+        """
+
+        table = self._table
+        stack : list[tuple[Trail, bool]] = [(trail, False)]
+
+        while len(stack) > 0:
+            node, children_done = stack.pop()
+
+            if id(node) in table:
+                continue
+
+            store = node.store
+
+            if store is None:
+                table[id(node)] = (node, BranchStats(0, 0, None, 0))
+
+            elif not children_done:
+                stack.append((node, True))
+                if isinstance(store, TrailSeries):
+                    stack.append((store.following, False))
+                else:
+                    stack.append((store.path_follow, False))
+                    stack.append((store.path_bottom, False))
+                    stack.append((store.path_top, False))
+
+            elif isinstance(store, TrailSeries):
+                following = table[id(store.following)][1]
+                table[id(node)] = (node, BranchStats(
+                    mountain_count = 1 + following.mountain_count,
+                    total_length = store.mountain.length + following.total_length,
+                    min_difficulty = self._min(store.mountain.difficulty_level, following.min_difficulty),
+                    best_score = self.score(store.mountain) + following.best_score,
+                    ))
+
+            else:
+                top = table[id(store.path_top)][1]
+                bottom = table[id(store.path_bottom)][1]
+                follow = table[id(store.path_follow)][1]
+                table[id(node)] = (node, BranchStats(
+                    mountain_count = top.mountain_count + bottom.mountain_count + follow.mountain_count,
+                    total_length = top.total_length + bottom.total_length + follow.total_length,
+                    min_difficulty = self._min(self._min(top.min_difficulty, bottom.min_difficulty), follow.min_difficulty),
+                    best_score = self.best(top.best_score, bottom.best_score) + follow.best_score,
+                    ))
+
+
+    def best(self, a: float, b: float) -> float:
+
+        """
+        Returns the better of two path scores under this memo's objective
+
+        Complexity:
+        - Worst case: O(1)
+        - Best case: O(1)
+        """
+
+        if self.maximise:
+            return max(a, b)
+        return min(a, b)
+
+
+    def clear(self) -> None:
+
+        """
+        Forgets every memoised node, e.g. after the trail was edited
+
+        Complexity:
+        - Worst case: O(1)
+        - Best case: O(1)
+        """
+
+        self._table = {}
+
+
+    def _min(self, a: int|None, b: int|None) -> int|None:
+
+        """
+        Minimum of two difficulties where None means "no mountain"
+
+        Complexity:
+        - Worst case: O(1)
+        - Best case: O(1)
+        """
+
+        if a is None:
+            return b
+        if b is None:
+            return a
+        return min(a, b)
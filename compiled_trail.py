@@ -0,0 +1,484 @@
+from __future__ import annotations
+
+from array import array
+from typing import Iterator, TYPE_CHECKING
+
+from mountain import Mountain
+from trail import Trail, TrailSeries
+from constants import EMPTY_KIND, SERIES_KIND, SPLIT_KIND
+
+# Avoid circular imports for typing.
+if TYPE_CHECKING:
+    from personality import WalkerPersonality
+
+
+class CompiledTrail:
+
+    """
+    A trail lowered into flat parallel arrays, indexed by node number.
+
+    Every Trail node becomes one entry:
+        - kind[i]           EMPTY_KIND, SERIES_KIND or SPLIT_KIND
+        - mountain[i]       index into the mountain columns (series only, else -1)
+        - next_node[i]      the following trail (series) or path_follow (split), else -1
+        - top[i], bottom[i] path_top and path_bottom (split only, else -1)
+
+    Nodes are numbered in post-order, so children always come before their parents
+    and `root` is the last node. Sub-trails shared by several parents (e.g. after
+    TrailInterner.intern) are compiled once.
+
+    Mountains are kept in a column store: `mountains` holds the original objects and
+    `names`, `difficulties`, `lengths` hold their fields.
+
+    The compiled trail is a snapshot; edits to the source trail need a fresh compile().
+    """
+
+    def __init__(self, trail: Trail) -> None:
+
+        """
+        defining the magic method : __init__
+        - Compiles the trail into the node and mountain arrays
+
+        Args:
+        - self
+        - trail - of Trail class
+
+        Raises:
+        - None
+
+        Returns:
+        - None
+
+        Complexity:
+        - Worst case: O(N) , where N is the number of nodes in the trail
+        - Best case: O(1) , when the trail is empty
+        """
+
+        self.kind = array("b")
+        self.mountain = array("i")
+        self.next_node = array("i")
+        self.top = array("i")
+        self.bottom = array("i")
+        self.trails : list[Trail] = []
+
+        self.mountains : list[Mountain] = []
+        self.names : list[str] = []
+        self.difficulties = array("q")
+        self.lengths = array("q")
+
+        node_index : dict[int, int] = {}
+        mountain_index : dict[int, int] = {}
+
+        # Post-order over an explicit stack, so long series do not hit the recursion limit.
+        stack : list[tuple[Trail, bool]] = [(trail, False)]
+
+        while len(stack) > 0:
+            node, children_done = stack.pop()
+
+            if id(node) in node_index:
+                continue
+
+            store = node.store
+
+            if store is not None and not children_done:
+                stack.append((node, True))
+                if isinstance(store, TrailSeries):
+                    stack.append((store.following, False))
+                else:
+                    stack.append((store.path_follow, False))
+                    stack.append((store.path_bottom, False))
+                    stack.append((store.path_top, False))
+                continue
+
+            node_index[id(node)] = len(self.kind)
+            self.trails.append(node)
+
+            if store is None:
+                self._add_node(EMPTY_KIND, -1, -1, -1, -1)
+
+            elif isinstance(store, TrailSeries):
+                if id(store.mountain) not in mountain_index:
+                    mountain_index[id(store.mountain)] = len(self.mountains)
+                    self._add_mountain(store.mountain)
+                self._add_node(SERIES_KIND, mountain_index[id(store.mountain)], node_index[id(store.following)], -1, -1)
+
+            else:
+                self._add_node(SPLIT_KIND, -1, node_index[id(store.path_follow)], node_index[id(store.path_top)], node_index[id(store.path_bottom)])
+
+        self.root = node_index[id(trail)]
+
+
+    def __len__(self) -> int:
+
+        """
+        Returns the number of compiled nodes
+
+        Complexity:
+        - Worst case: O(1)
+        - Best case: O(1)
+        """
+
+        return len(self.kind)
+
+
+    def follow_path(self, personality: WalkerPersonality) -> None:
+
+        """
+        - Array-based equivalent of Trail.follow_path
+        - select_branch still receives the original Trail branches, so every personality works unchanged
+
+        Args:
+        - self
+        - personality - of WalkerPersonality class
+
+        Raises:
+        - None
+
+        Returns:
+        - None
+
+        Complexity:
+        - Worst case: O(N) , where N is the number of nodes on the walked path
+        - Best case: O(1)
+        """
+
+        kind, mountain, next_node, top, bottom = self.kind, self.mountain, self.next_node, self.top, self.bottom
+        mountains, trails = self.mountains, self.trails
+        add_mountain, select_branch = personality.add_mountain, personality.select_branch
+
+        stack : list[int] = [self.root]
+
+        while len(stack) > 0:
+            node = stack.pop()
+
+            while kind[node] != EMPTY_KIND:
+                if kind[node] == SERIES_KIND:
+                    add_mountain(mountains[mountain[node]])
+                    node = next_node[node]
+                else:
+                    stack.append(next_node[node])
+                    if select_branch(trails[top[node]], trails[bottom[node]]):
+                        node = top[node]
+                    else:
+                        node = bottom[node]
+
+
+    def follow_paths(self, personalities: list[WalkerPersonality]) -> None:
+
+        """
+        - Array-based equivalent of Trail.follow_paths: walks a population of personalities together,
+          splitting the group at each branch decision and merging it back on the following path
+
+        Args:
+        - self
+        - personalities - list of WalkerPersonality
+
+        Raises:
+        - None
+
+        Returns:
+        - None
+
+        Complexity:
+        - Worst case: O(N * W) , where N is the number of nodes and W the number of personalities
+        - Best case: O(W)
+        """
+
+        kind, mountain, next_node, top, bottom = self.kind, self.mountain, self.next_node, self.top, self.bottom
+        mountains, trails = self.mountains, self.trails
+
+        stack : list[tuple[int, list[WalkerPersonality]]] = [(self.root, list(personalities))]
+
+        while len(stack) > 0:
+            node, walkers = stack.pop()
+
+            while kind[node] != EMPTY_KIND and len(walkers) > 0:
+                if kind[node] == SERIES_KIND:
+                    current = mountains[mountain[node]]
+                    for walker in walkers:
+                        walker.add_mountain(current)
+                    node = next_node[node]
+                else:
+                    top_branch, bottom_branch = trails[top[node]], trails[bottom[node]]
+                    top_walkers : list[WalkerPersonality] = []
+                    bottom_walkers : list[WalkerPersonality] = []
+                    for walker in walkers:
+                        if walker.select_branch(top_branch, bottom_branch):
+                            top_walkers.append(walker)
+                        else:
+                            bottom_walkers.append(walker)
+
+                    stack.append((next_node[node], walkers))
+                    stack.append((bottom[node], bottom_walkers))
+                    node = top[node]
+                    walkers = top_walkers
+
+
+    def collect_all_mountains(self) -> list[Mountain]:
+
+        """
+        - Array-based equivalent of Trail.collect_all_mountains (same order, shared sub-trails repeated)
+
+        Args:
+        - self
+
+        Raises:
+        - None
+
+        Returns:
+        - List of Mountain
+
+        Complexity:
+        - Worst case: O(N) , where N is the number of nodes in the uncompiled trail
+        - Best case: O(1)
+        """
+
+        kind, mountain, next_node, top, bottom = self.kind, self.mountain, self.next_node, self.top, self.bottom
+        mountains = self.mountains
+
+        result : list[Mountain] = []
+        stack : list[int] = [self.root]
+
+        while len(stack) > 0:
+            node = stack.pop()
+
+            while kind[node] != EMPTY_KIND:
+                if kind[node] == SERIES_KIND:
+                    result.append(mountains[mountain[node]])
+                    node = next_node[node]
+                else:
+                    stack.append(next_node[node])
+                    stack.append(bottom[node])
+                    node = top[node]
+
+        return result
+
+
+    def iter_paths(self, prefix: tuple[bool, ...] = (), max_length: int|None = None) -> Iterator[tuple[int, ...]]:
+
+        """
+        - Yields every path as a tuple of mountain indices, in the same order as Trail.collect_mountain_list
+        - prefix fixes the first branch decisions met on the way (True = top, False = bottom)
+        - Paths longer than max_length are abandoned as soon as they exceed it
+
+        Args:
+        - self
+        - prefix - tuple of bool, forced decisions for the first len(prefix) splits
+        - max_length - int or None, the longest path to yield
+
+        Raises:
+        - None
+
+        Returns:
+        - Iterator of tuple of int
+
+        Complexity:
+        - Worst case: O(P * L) , where P is the number of paths and L the longest path
+        - Best case: O(L) , when the trail has no splits
+        """
+
+        kind, mountain, next_node, top, bottom = self.kind, self.mountain, self.next_node, self.top, self.bottom
+
+        path : list[int] = []
+        # (node, path length, continuation, decisions made). The continuation is a linked
+        # list of (path_follow, rest) tuples to resume once a branch ends.
+        stack : list[tuple[int, int, tuple|None, int]] = [(self.root, 0, None, 0)]
+
+        while len(stack) > 0:
+            node, depth, cont, decisions = stack.pop()
+            del path[depth:]
+
+            while True:
+                if kind[node] == SERIES_KIND:
+                    path.append(mountain[node])
+                    if max_length is not None and len(path) > max_length:
+                        break
+                    node = next_node[node]
+
+                elif kind[node] == SPLIT_KIND:
+                    cont = (next_node[node], cont)
+                    if decisions < len(prefix):
+                        node = top[node] if prefix[decisions] else bottom[node]
+                    else:
+                        stack.append((bottom[node], len(path), cont, decisions + 1))
+                        node = top[node]
+                    decisions += 1
+
+                elif cont is None:
+                    yield tuple(path)
+                    break
+
+                else:
+                    node, cont = cont
+
+
+    def collect_mountain_list(self) -> list[list[Mountain]]:
+
+        """
+        - Array-based equivalent of Trail.collect_mountain_list
+
+        Args:
+        - self
+
+        Raises:
+        - None
+
+        Returns:
+        - A list of list of Mountain
+
+        Complexity:
+        - Worst case: O(P * L) , where P is the number of paths and L the longest path
+        - Best case: O(L)
+        """
+
+        mountains = self.mountains
+        return [[mountains[i] for i in path] for path in self.iter_paths()]
+
+
+    def length_k_paths(self, k: int) -> list[list[Mountain]]:
+
+        """
+        - Array-based equivalent of Trail.length_k_paths, pruning paths as soon as they exceed k
+
+        Args:
+        - self
+        - k - int, the number of mountains on each returned path
+
+        Raises:
+        - None
+
+        Returns:
+        - A list of list of Mountain
+
+        Complexity:
+        - Worst case: O(P * k) , where P is the number of path prefixes of length at most k + 1
+        - Best case: O(k)
+        """
+
+        mountains = self.mountains
+        return [[mountains[i] for i in path] for path in self.iter_paths(max_length = k) if len(path) == k]
+
+
+    def count_paths(self) -> int:
+
+        """
+        - Returns the number of distinct paths, computed bottom-up without enumerating them
+
+        Args:
+        - self
+
+        Raises:
+        - None
+
+        Returns:
+        - int
+
+        Complexity:
+        - Worst case: O(N) , where N is the number of compiled nodes
+        - Best case: O(N)
+        """
+
+        kind, next_node, top, bottom = self.kind, self.next_node, self.top, self.bottom
+        counts : list[int] = [1] * len(kind)
+
+        # Post-order numbering: children are always counted before their parents.
+        for node in range(len(kind)):
+            if kind[node] == SERIES_KIND:
+                counts[node] = counts[next_node[node]]
+            elif kind[node] == SPLIT_KIND:
+                counts[node] = (counts[top[node]] + counts[bottom[node]]) * counts[next_node[node]]
+
+        return counts[self.root]
+
+
+    def encode(self) -> tuple[int, bytes, bytes, bytes, bytes, bytes]:
+
+        """
+        - Returns a compact, picklable encoding of the node arrays (without the mountain objects),
+          e.g. to ship the trail to worker processes
+
+        Args:
+        - self
+
+        Raises:
+        - None
+
+        Returns:
+        - tuple of the root index and the raw bytes of kind, mountain, next_node, top and bottom
+
+        Complexity:
+        - Worst case: O(N) , where N is the number of compiled nodes
+        - Best case: O(N)
+        """
+
+        return (self.root, self.kind.tobytes(), self.mountain.tobytes(), self.next_node.tobytes(), self.top.tobytes(), self.bottom.tobytes())
+
+
+    @classmethod
+    def decode(cls, encoding: tuple[int, bytes, bytes, bytes, bytes, bytes]) -> CompiledTrail:
+
+        """
+        - Rebuilds the node arrays from encode()
+        - The result has no mountain objects or source trails, so only index-based methods
+          such as iter_paths and count_paths can be used on it
+
+        Args:
+        - cls
+        - encoding - the tuple returned by encode
+
+        Raises:
+        - None
+
+        Returns:
+        - CompiledTrail
+
+        Complexity:
+        - Worst case: O(N) , where N is the number of compiled nodes
+        - Best case: O(N)
+        """
+
+        compiled = cls.__new__(cls)
+        compiled.root = encoding[0]
+        compiled.kind, compiled.mountain, compiled.next_node, compiled.top, compiled.bottom = array("b"), array("i"), array("i"), array("i"), array("i")
+        for column, raw in zip((compiled.kind, compiled.mountain, compiled.next_node, compiled.top, compiled.bottom), encoding[1:]):
+            column.frombytes(raw)
+
+        compiled.trails = []
+        compiled.mountains = []
+        compiled.names = []
+        compiled.difficulties = array("q")
+        compiled.lengths = array("q")
+        return compiled
+
+
+    def _add_node(self, kind: int, mountain: int, next_node: int, top: int, bottom: int) -> None:
+
+        """
+        Appends one node to the parallel arrays
+
+        Complexity:
+        - Worst case: O(1) amortised
+        - Best case: O(1)
+        """
+
+        self.kind.append(kind)
+        self.mountain.append(mountain)
+        self.next_node.append(next_node)
+        self.top.append(top)
+        self.bottom.append(bottom)
+
+
+    def _add_mountain(self, mountain: Mountain) -> None:
+
+        """
+        Appends one mountain to the column store
+
+        Complexity:
+        - Worst case: O(1) amortised
+        - Best case: O(1)
+        """
+
+        self.mountains.append(mountain)
+        self.names.append(mountain.name)
+        self.difficulties.append(mountain.difficulty_level)
+        self.lengths.append(mountain.length)
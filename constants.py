@@ -5,3 +5,8 @@ class DrawMode(Enum):
     ADD_MOUNTAIN = auto()
     ADD_BRANCH = auto()
     REMOVE = auto()
+
+# Node-kind tags for trail nodes (TrailSeries.KIND, TrailSplit.KIND) and their flattened forms.
+EMPTY_KIND = 0
+SERIES_KIND = 1
+SPLIT_KIND = 2
@@ -0,0 +1,351 @@
+""" Sorted list ADT stored in blocks.
+
+Items are kept in sorted order across a list of small sorted blocks, each with a parallel
+list of precomputed keys. A Fenwick tree over the block lengths gives ranks in O(log n).
+"""
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from typing import Callable, Generic, Iterable, Iterator, TypeVar
+
+T = TypeVar('T')
+
+
+class BlockSortedList(Generic[T]):
+    """
+    Sorted list made of blocks of at most 2 * LOAD items.
+
+    Type Arguments:
+        - T:    Item Type. key(item) must give comparable keys.
+
+    Equal keys keep their insertion order (new items go after existing equal ones).
+    """
+
+    LOAD = 256
+
+    def __init__(self, key: Callable[[T], object] = lambda x: x, load: int|None = None) -> None:
+        """
+        Initialise an empty sorted list.
+        :complexity: O(1)
+        """
+        self.key = key
+        if load is not None:
+            self.LOAD = load
+        self._blocks : list[list[T]] = []
+        self._keys : list[list[object]] = []
+        self._maxes : list[object] = []
+        self._fenwick : list[int] = [0]
+        self._len = 0
+
+    @classmethod
+    def from_sorted(cls, items: list[T], key: Callable[[T], object] = lambda x: x, keys: list|None = None, load: int|None = None) -> BlockSortedList[T]:
+        """
+        Build a sorted list from items that are already sorted by key.
+        keys may hold the precomputed key of every item.
+
+        :complexity: O(N) where N is len(items), plus N calls to key if keys is None.
+        """
+        result = cls(key, load)
+        if keys is None:
+            keys = [key(item) for item in items]
+        for start in range(0, len(items), result.LOAD):
+            result._blocks.append(items[start:start + result.LOAD])
+            result._keys.append(keys[start:start + result.LOAD])
+            result._maxes.append(result._keys[-1][-1])
+        result._len = len(items)
+        result._rebuild_fenwick()
+        return result
+
+    @classmethod
+    def from_sorted_pairs(cls, pairs: Iterable[tuple[object, T]], key: Callable[[T], object] = lambda x: x, load: int|None = None) -> BlockSortedList[T]:
+        """
+        Build a sorted list from a stream of (key, item) pairs already sorted by key,
+        one block at a time, so the stream is never collected into one list.
+
+        :complexity: O(N) where N is the number of pairs.
+        """
+        result = cls(key, load)
+        block : list[T] = []
+        block_keys : list[object] = []
+        for item_key, item in pairs:
+            block.append(item)
+            block_keys.append(item_key)
+            if len(block) == result.LOAD:
+                result._append_block(block, block_keys)
+                block, block_keys = [], []
+        if len(block) > 0:
+            result._append_block(block, block_keys)
+        result._rebuild_fenwick()
+        return result
+
+    def __len__(self) -> int:
+        """ :complexity: O(1) """
+        return self._len
+
+    def __iter__(self) -> Iterator[T]:
+        """
+        Iterate over the items in sorted order.
+        :complexity: O(N)
+        """
+        for block in self._blocks:
+            yield from block
+
+    def keys(self) -> Iterator[object]:
+        """
+        Iterate over the precomputed keys in sorted order.
+        :complexity: O(N)
+        """
+        for block_keys in self._keys:
+            yield from block_keys
+
+    def add(self, item: T, item_key: object = None) -> None:
+        """
+        Insert an item in sorted position. item_key may be the precomputed key(item).
+
+        :complexity: O(log(N) + LOAD) amortised, plus O(N / LOAD) when a block splits.
+        """
+        if item_key is None:
+            item_key = self.key(item)
+
+        if len(self._blocks) == 0:
+            self._blocks.append([item])
+            self._keys.append([item_key])
+            self._maxes.append(item_key)
+            self._len = 1
+            self._rebuild_fenwick()
+            return
+
+        block = bisect_right(self._maxes, item_key)
+        if block == len(self._blocks):
+            # Larger than everything: goes at the end of the last block.
+            block -= 1
+            self._blocks[block].append(item)
+            self._keys[block].append(item_key)
+            self._maxes[block] = item_key
+        else:
+            position = bisect_right(self._keys[block], item_key)
+            self._blocks[block].insert(position, item)
+            self._keys[block].insert(position, item_key)
+
+        self._len += 1
+        self._fenwick_add(block, 1)
+
+        if len(self._blocks[block]) > 2 * self.LOAD:
+            self._split(block)
+
+    def update(self, items: list[T], keys: list|None = None) -> None:
+        """
+        Insert many items. keys may hold the precomputed key of every item.
+
+        :complexity: O(K * (log(N) + LOAD)) where K is len(items).
+        """
+        if keys is None:
+            keys = [self.key(item) for item in items]
+        for item, item_key in zip(items, keys):
+            self.add(item, item_key)
+
+    def index(self, item: T) -> int:
+        """
+        Return the rank (0-based position) of the item with the same key as item.
+
+        :complexity: O(log(N))
+        :raises KeyError: if no item has that key.
+        """
+        item_key = self.key(item)
+        block = bisect_left(self._maxes, item_key)
+        if block < len(self._blocks):
+            position = bisect_left(self._keys[block], item_key)
+            if position < len(self._keys[block]) and self._keys[block][position] == item_key:
+                return self._prefix(block) + position
+        raise KeyError("Item", item, "does not exist")
+
+    def __getitem__(self, rank: int) -> T:
+        """
+        Return the item at the given rank (0-based position), negative ranks count from the end.
+
+        :complexity: O(log(N))
+        :raises IndexError: if rank is out of range.
+        """
+        if rank < 0:
+            rank += self._len
+        if not 0 <= rank < self._len:
+            raise IndexError("Rank", rank, "out of range")
+        block, position = self._locate(rank)
+        return self._blocks[block][position]
+
+    def select(self, rank: int) -> T:
+        """
+        Return the item at the given rank. Same as self[rank].
+        :complexity: O(log(N))
+        """
+        return self[rank]
+
+    def rank(self, item: T) -> int:
+        """
+        Return the rank of the item with the same key as item. Same as self.index(item).
+        :complexity: O(log(N))
+        """
+        return self.index(item)
+
+    def bisect_key_left(self, item_key: object) -> int:
+        """
+        Return the number of items whose key is smaller than item_key.
+        :complexity: O(log(N))
+        """
+        block = bisect_left(self._maxes, item_key)
+        if block == len(self._blocks):
+            return self._len
+        return self._prefix(block) + bisect_left(self._keys[block], item_key)
+
+    def bisect_key_right(self, item_key: object) -> int:
+        """
+        Return the number of items whose key is smaller than or equal to item_key.
+        :complexity: O(log(N))
+        """
+        block = bisect_right(self._maxes, item_key)
+        if block == len(self._blocks):
+            return self._len
+        return self._prefix(block) + bisect_right(self._keys[block], item_key)
+
+    def iter_from(self, rank: int) -> Iterator[tuple[object, T]]:
+        """
+        Iterate over (key, item) pairs in sorted order, starting at the given rank.
+        :complexity: O(log(N)) to start, then O(1) per item.
+        """
+        if rank >= self._len:
+            return
+        block, position = self._locate(rank)
+        for current in range(block, len(self._blocks)):
+            yield from zip(self._keys[current][position:], self._blocks[current][position:])
+            position = 0
+
+    def drain(self) -> Iterator[tuple[object, T]]:
+        """
+        Iterate over (key, item) pairs in sorted order while emptying the list.
+        The list is empty as soon as the iteration starts, and each block is let go
+        once it has been iterated, so only the items still referenced elsewhere stay alive.
+
+        :complexity: O(N)
+        """
+        blocks, keys = self._blocks, self._keys
+        self._blocks, self._keys, self._maxes = [], [], []
+        self._fenwick = [0]
+        self._len = 0
+        for index in range(len(blocks)):
+            block, block_keys = blocks[index], keys[index]
+            blocks[index] = keys[index] = None
+            yield from zip(block_keys, block)
+
+    def remove(self, item: T) -> None:
+        """
+        Remove the item with the same key as item. If several items share that key,
+        item itself is removed when present, otherwise the first of them.
+
+        :complexity: O(log(N) + LOAD) amortised, plus O(N / LOAD) when a block empties.
+        :raises KeyError: if no item has that key.
+        """
+        item_key = self.key(item)
+        rank = self.index(item)
+        block, position = self._locate(rank)
+
+        # Look for item itself among the equal keys.
+        current, offset = block, position
+        while current < len(self._blocks):
+            if offset == len(self._keys[current]):
+                current, offset = current + 1, 0
+                continue
+            if self._keys[current][offset] != item_key:
+                break
+            if self._blocks[current][offset] is item:
+                block, position = current, offset
+                break
+            offset += 1
+
+        del self._blocks[block][position]
+        del self._keys[block][position]
+        self._len -= 1
+
+        if len(self._blocks[block]) == 0:
+            del self._blocks[block]
+            del self._keys[block]
+            del self._maxes[block]
+            self._rebuild_fenwick()
+        else:
+            self._maxes[block] = self._keys[block][-1]
+            self._fenwick_add(block, -1)
+
+    def _locate(self, rank: int) -> tuple[int, int]:
+        """
+        Return the (block, position) of the item at rank, by descending the Fenwick tree.
+        :complexity: O(log(N / LOAD))
+        """
+        block = 0
+        step = 1
+        while step * 2 < len(self._fenwick):
+            step *= 2
+        while step > 0:
+            if block + step < len(self._fenwick) and self._fenwick[block + step] <= rank:
+                block += step
+                rank -= self._fenwick[block]
+            step //= 2
+        return block, rank
+
+    def _append_block(self, block: list[T], block_keys: list[object]) -> None:
+        """
+        Append a block whose keys are all at least those already in the list.
+        The Fenwick tree is not updated: the caller rebuilds it.
+        :complexity: O(1)
+        """
+        self._blocks.append(block)
+        self._keys.append(block_keys)
+        self._maxes.append(block_keys[-1])
+        self._len += len(block)
+
+    def _split(self, block: int) -> None:
+        """
+        Split an oversized block in two.
+        :complexity: O(LOAD + N / LOAD)
+        """
+        half = len(self._blocks[block]) // 2
+        self._blocks.insert(block + 1, self._blocks[block][half:])
+        self._keys.insert(block + 1, self._keys[block][half:])
+        del self._blocks[block][half:]
+        del self._keys[block][half:]
+        self._maxes[block] = self._keys[block][-1]
+        self._maxes.insert(block + 1, self._keys[block + 1][-1])
+        self._rebuild_fenwick()
+
+    def _rebuild_fenwick(self) -> None:
+        """
+        Rebuild the Fenwick tree over the block lengths.
+        :complexity: O(N / LOAD)
+        """
+        self._fenwick = [0] * (len(self._blocks) + 1)
+        for block in range(len(self._blocks)):
+            index = block + 1
+            self._fenwick[index] += len(self._blocks[block])
+            parent = index + (index & -index)
+            if parent < len(self._fenwick):
+                self._fenwick[parent] += self._fenwick[index]
+
+    def _fenwick_add(self, block: int, delta: int) -> None:
+        """
+        Add delta to the recorded length of a block.
+        :complexity: O(log(N / LOAD))
+        """
+        index = block + 1
+        while index < len(self._fenwick):
+            self._fenwick[index] += delta
+            index += index & -index
+
+    def _prefix(self, block: int) -> int:
+        """
+        Total number of items in the blocks before block.
+        :complexity: O(log(N / LOAD))
+        """
+        total = 0
+        index = block
+        while index > 0:
+            total += self._fenwick[index]
+            index -= index & -index
+        return total
@@ -25,8 +25,8 @@ class Box:
                 return True
         return False
 
-# These inheritance models are just for hinting that we are injection
-# the box attributes into the existing trail classes.
+# The trail classes use __slots__, so the box attributes live on these subclasses.
+# main.py loads trails as TrailBox nodes so they can be drawn.
 
 @dataclass
 class TrailSplitBox(TrailSplit):
@@ -46,6 +46,10 @@ class TrailBox(Trail):
 
     trail_box: Box = field(default_factory=Box)
 
+# Edits on box nodes build box nodes, so freshly added parts of the trail can be drawn.
+for _box_type in (TrailBox, TrailSeriesBox, TrailSplitBox):
+    _box_type.TRAIL, _box_type.SERIES, _box_type.SPLIT = TrailBox, TrailSeriesBox, TrailSplitBox
+
 class TrailDraw:
 
     ### Visual constants
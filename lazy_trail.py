@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import mmap
+import sys
+from array import array
+
+from mountain import Mountain
+from trail import Trail, TrailSeries, TrailSplit, TrailStore
+from constants import EMPTY_KIND, SERIES_KIND
+from serialize import read_binary_header
+
+
+class LazyTrail(Trail):
+
+    """
+    A Trail whose store is read from a MappedTrail the first time it is used.
+
+    Reading `store` builds just this node's TrailSeries or TrailSplit, whose children are
+    in turn LazyTrail nodes not read yet, so walking one path through a huge trail only
+    materialises the nodes on that path. Everything on Trail (follow_path,
+    collect_all_mountains, length_k_paths, the edit methods, ...) works on it unchanged.
+    """
+
+    __slots__ = ("_store", "_view", "_index")
+
+    def __init__(self, store: TrailStore = None) -> None:
+
+        """
+        defining the magic method : __init__
+        - An already materialised node (as built by the edit methods)
+
+        Complexity:
+        - Worst case: O(1)
+        - Best case: O(1)
+        """
+
+        self._store = store
+        self._view : MappedTrail|None = None
+        self._index = -1
+
+
+    @property
+    def store(self) -> TrailStore:
+
+        """
+        - Returns the store of this node, reading it from the mapped file on first use
+
+        Complexity:
+        - Worst case: O(len(name)) , when the node is a series whose mountain was not read yet
+        - Best case: O(1) , when the node is already materialised
+        """
+
+        if self._view is not None:
+            self._store = self._view._materialise(self._index)
+            self._view = None
+        return self._store
+
+
+    @store.setter
+    def store(self, store: TrailStore) -> None:
+
+        """
+        - Replaces the store of this node
+
+        Complexity:
+        - Worst case: O(1)
+        - Best case: O(1)
+        """
+
+        self._store = store
+        self._view = None
+
+
+# Edits on a lazy trail build lazy (already materialised) nodes.
+LazyTrail.TRAIL = LazyTrail
+
+
+class MappedTrail:
+
+    """
+    A binary trail file (see serialize.dump_binary) memory-mapped for lazy reading.
+
+    The node and mountain columns are read in place from the mapping. Each node and each
+    mountain is built at most once and then reused, so sub-trails shared in the file stay
+    shared. Materialised nodes keep no reference to the mapping: they stay usable after close().
+    """
+
+    def __init__(self, path: str) -> None:
+
+        """
+        defining the magic method : __init__
+        - Maps the file and locates its columns; no node is built yet
+
+        Args:
+        - self
+        - path - str, a file written by serialize.dump_binary
+
+        Raises:
+        - ValueError if the file is not a binary trail
+        - OSError if the file cannot be read
+
+        Returns:
+        - None
+
+        Complexity:
+        - Worst case: O(1) , or O(N) on big-endian machines where the columns are copied
+        - Best case: O(1)
+        """
+
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access = mmap.ACCESS_READ)
+        except ValueError:
+            # An empty file cannot be mapped.
+            self._file.close()
+            raise ValueError("Not a binary trail")
+
+        try:
+            node_count, mountain_count, self._root_index, pool_size, layout = read_binary_header(self._map)
+        except ValueError:
+            self._map.close()
+            self._file.close()
+            raise
+
+        self._buffer = memoryview(self._map)
+        self._columns = {}
+        for name, (offset, typecode, count) in layout.items():
+            if name == "pool":
+                continue
+            raw = self._buffer[offset:offset + count * array(typecode).itemsize]
+            if sys.byteorder == "little":
+                self._columns[name] = raw.cast(typecode)
+            else:
+                column = array(typecode, raw.tobytes())
+                column.byteswap()
+                self._columns[name] = column
+        self._pool = self._buffer[layout["pool"][0]:layout["pool"][0] + pool_size]
+
+        self.node_count = node_count
+        self.mountain_count = mountain_count
+        self._nodes : dict[int, LazyTrail] = {}
+        self._mountains : dict[int, Mountain] = {}
+
+
+    @property
+    def root(self) -> LazyTrail:
+
+        """
+        - Returns the root of the trail
+
+        Complexity:
+        - Worst case: O(1)
+        - Best case: O(1)
+        """
+
+        return self.node(self._root_index)
+
+
+    def node(self, index: int) -> LazyTrail:
+
+        """
+        - Returns the (not yet materialised) trail node with the given index
+
+        Complexity:
+        - Worst case: O(1)
+        - Best case: O(1)
+        """
+
+        node = self._nodes.get(index)
+        if node is None:
+            node = LazyTrail()
+            node._view = self
+            node._index = index
+            self._nodes[index] = node
+        return node
+
+
+    def mountain(self, index: int) -> Mountain:
+
+        """
+        - Returns the mountain with the given index in the mountain table
+
+        Complexity:
+        - Worst case: O(len(name))
+        - Best case: O(1) , when it was read before
+        """
+
+        mountain = self._mountains.get(index)
+        if mountain is None:
+            columns = self._columns
+            start = columns["name_offsets"][index]
+            name = bytes(self._pool[start:start + columns["name_lengths"][index]]).decode("utf-8")
+            mountain = Mountain(name, columns["difficulties"][index], columns["lengths"][index])
+            self._mountains[index] = mountain
+        return mountain
+
+
+    def close(self) -> None:
+
+        """
+        - Unmaps the file; nodes not materialised yet can no longer be read
+
+        Complexity:
+        - Worst case: O(1)
+        - Best case: O(1)
+        """
+
+        if self._buffer is None:
+            return
+        for column in self._columns.values():
+            if isinstance(column, memoryview):
+                column.release()
+        self._columns = {}
+        self._pool.release()
+        self._buffer.release()
+        self._buffer = None
+        self._map.close()
+        self._file.close()
+
+
+    def __enter__(self) -> MappedTrail:
+        return self
+
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+    def _materialise(self, index: int) -> TrailStore:
+
+        """
+        - Builds the store of node index, with lazy children
+
+        Raises:
+        - ValueError if the file was closed
+
+        Complexity:
+        - Worst case: O(len(name))
+        - Best case: O(1)
+        """
+
+        if self._buffer is None:
+            raise ValueError("Trail file is closed")
+
+        columns = self._columns
+        kind = columns["kind"][index]
+        if kind == EMPTY_KIND:
+            return None
+        if kind == SERIES_KIND:
+            return TrailSeries(self.mountain(columns["mountain"][index]), self.node(columns["next_node"][index]))
+        return TrailSplit(self.node(columns["top"][index]), self.node(columns["bottom"][index]), self.node(columns["next_node"][index]))
+
+
+def open_trail(path: str) -> MappedTrail:
+
+    """
+    - Memory-maps a binary trail file for lazy reading; use its root as a Trail
+
+    Args:
+    - path - str, a file written by serialize.dump_binary
+
+    Raises:
+    - ValueError if the file is not a binary trail
+
+    Returns:
+    - MappedTrail
+
+    Complexity:
+    - Worst case: O(1)
+    - Best case: O(1)
+    """
+
+    return MappedTrail(path)
@@ -5,7 +5,6 @@ Requires no student import, but will use your implemented classes as part of it'
 
 import arcade
 import arcade.gui as gui
-import json
 import sys
 import secrets
 from copy import copy
@@ -14,10 +13,9 @@ from constants import DrawMode
 from mountain import Mountain
 from mountain_manager import MountainManager
 from trail import Trail, TrailSeries, TrailSplit
-from draw_trails import TrailDraw
-from mountain_organiser import MountainOrganiser
-from double_key_table import DoubleKeyTable
-from serialize import serialize, deserialize
+from draw_trails import TrailDraw, TrailBox
+from rank_history import RankHistory
+from serialize import dump, load
 
 class MyWindow(arcade.Window):
     """ Painter Window """
@@ -277,9 +275,10 @@ class MyWindow(arcade.Window):
         """Set up the game and initialize the variables."""
         self.reset()
         self.mountain_manager = MountainManager()
+        self.rank_history = RankHistory(self.mountain_manager)
         self.cur_filename = sys.argv[1] if len(sys.argv) > 1 else "basic.json"
         with open(f"stores/{self.cur_filename}", "r") as f:
-            t = deserialize(json.loads(f.read()))
+            t = load(f, TrailBox)
         try:
             # Try to add all existing mountains
             for mountain in t.collect_all_mountains():
@@ -389,26 +388,15 @@ class MyWindow(arcade.Window):
                 int(255*x)
                 for x in colorsys.hls_to_rgb(index/total, 0.6, 0.6)
             ]
-        groups = self.mountain_manager.group_by_difficulty()
-        to = MountainOrganiser()
-        positions = DoubleKeyTable()
-        positions.hash1 = lambda k: (k % positions.table_size)
-        all_mountains = []
-        for i, group in enumerate(groups):
-            to.add_mountains(group)
-            for mountain in group:
-                positions[mountain.difficulty_level, mountain.name] = []
-            all_mountains.extend(group)
-            for mountain in all_mountains:
-                positions[mountain.difficulty_level, mountain.name].append(to.cur_position(mountain))
+        histories = self.rank_history.histories()
         self.graph_data = [
             [
-                get_col(i, len(all_mountains)),
-                len(groups) - len(positions[mountain.difficulty_level, mountain.name]),
+                get_col(i, len(histories)),
+                group_index,
                 mountain.name,
-                positions[mountain.difficulty_level, mountain.name]
+                ranks
             ]
-            for i, mountain in enumerate(all_mountains)
+            for i, (mountain, group_index, ranks) in enumerate(histories)
         ]
 
     def on_save_file_clicked(self):
@@ -464,7 +452,7 @@ class MyWindow(arcade.Window):
     def on_file_save_clicked(self, event):
         new_path = str(self.input_file_name.text)
         with open(f"stores/{new_path}", "w") as f:
-            f.write(serialize(self.mountain.trail))
+            dump(self.mountain.trail, f)
         # Close the window.
         self.on_file_close_clicked(event)
 
@@ -1,9 +1,25 @@
 from __future__ import annotations
 from dataclasses import dataclass
 
-@dataclass
+@dataclass(slots=True)
 class Mountain:
 
     name: str
     difficulty_level: int
     length: int
+
+@dataclass(slots=True, frozen=True)
+class FrozenMountain:
+    """
+    Immutable, hashable mountain with the same fields as Mountain.
+    Usable anywhere a Mountain is only read (trails, personalities, the organiser),
+    but not in places that edit mountains in place, such as the GUI edit dialog.
+    """
+
+    name: str
+    difficulty_level: int
+    length: int
+
+    def thaw(self) -> Mountain:
+        """Returns an editable Mountain with the same fields."""
+        return Mountain(self.name, self.difficulty_level, self.length)
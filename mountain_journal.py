@@ -0,0 +1,335 @@
+from __future__ import annotations
+
+import os
+import struct
+import zlib
+
+from mountain import Mountain
+from mountain_manager import MountainManager
+from snapshot import save_snapshot, load_snapshot
+
+"""
+Crash-safe persistence for MountainManager.
+
+A DurableMountainManager keeps its state in a directory as a snapshot (see snapshot.py) plus an
+append-only log of the changes made since that snapshot. Every change is appended to the log
+before it is applied. On startup the snapshot is loaded and the log replayed on top of it.
+
+Log layout (little-endian):
+    LOG_HEADER              magic, the manager version the log starts from
+    records                 RECORD (payload length, crc32 of op and payload, op) then the payload
+
+A payload is one mountain (add, remove) or two (edit: old then new), each as MOUNTAIN followed
+by the utf-8 name. Replay stops at the first short or corrupt record (a write torn by a crash),
+and the log is cut back to the last good record.
+"""
+
+LOG_MAGIC = b"MMLOG\x00\x00\x01"
+
+LOG_HEADER = struct.Struct("<8sq")
+RECORD = struct.Struct("<IIB")
+# difficulty, length, name length
+MOUNTAIN = struct.Struct("<qqI")
+
+ADD = 1
+REMOVE = 2
+EDIT = 3
+
+
+class DurableMountainManager(MountainManager):
+
+    # Changes are fsynced to the log in batches of this many records.
+    SYNC_EVERY = 64
+    # After this many records the state is compacted into a new snapshot and the log restarted.
+    COMPACT_EVERY = 10000
+
+    SNAPSHOT_NAME = "mountains.snap"
+    LOG_NAME = "mountains.log"
+
+    def __init__(self, directory: str, secondary_indexes: bool = False, sync_every: int|None = None, compact_every: int|None = None) -> None:
+
+        """
+        defining the magic method : __init__
+        - Restores the manager from the snapshot and log in directory (created if missing),
+          then opens the log to record further changes
+
+        Args:
+        - self
+        - directory - str, where the snapshot and the log are kept
+        - secondary_indexes - bool, as for MountainManager
+        - sync_every - int or None, overrides SYNC_EVERY
+        - compact_every - int or None, overrides COMPACT_EVERY
+
+        Raises:
+        - OSError if the directory cannot be read or written
+
+        Returns:
+        - None
+
+        Complexity:
+        - Worst case: O(S + R) , where S is the size of the snapshot and R the number of logged records
+        - Best case: O(1) , when the directory is empty
+        """
+
+        super().__init__(secondary_indexes = secondary_indexes)
+        if sync_every is not None:
+            self.SYNC_EVERY = sync_every
+        if compact_every is not None:
+            self.COMPACT_EVERY = compact_every
+
+        os.makedirs(directory, exist_ok = True)
+        self.snapshot_path = os.path.join(directory, self.SNAPSHOT_NAME)
+        self.log_path = os.path.join(directory, self.LOG_NAME)
+
+        self._logging = False
+        self._log_file = None
+        self._unsynced = 0
+        self._logged = 0
+
+        if os.path.exists(self.snapshot_path):
+            load_snapshot(self.snapshot_path, self)
+        self._replay()
+
+        self._log_file = open(self.log_path, "ab")
+        self._logging = True
+
+
+    def add_mountain(self, mountain: Mountain) -> None:
+
+        """
+        - Logs, then adds a mountain to the manager
+
+        Complexity:
+        - Worst case: O(len(name)) , plus an fsync every SYNC_EVERY changes and a compaction every COMPACT_EVERY
+        - Best case: O(len(name))
+        """
+
+        self._log(ADD, mountain)
+        super().add_mountain(mountain)
+        self._logged_change()
+
+
+    def remove_mountain(self, mountain: Mountain) -> None:
+
+        """
+        - Logs, then removes a mountain from the manager
+
+        Complexity:
+        - Worst case: O(len(name)) , plus an fsync every SYNC_EVERY changes and a compaction every COMPACT_EVERY
+        - Best case: O(len(name))
+        """
+
+        self._log(REMOVE, mountain)
+        super().remove_mountain(mountain)
+        self._logged_change()
+
+
+    def edit_mountain(self, old: Mountain, new: Mountain) -> None:
+
+        """
+        - Logs, then applies an edit as a single record (not as a remove and an add)
+
+        Complexity:
+        - Worst case: O(len(names)) , plus an fsync every SYNC_EVERY changes and a compaction every COMPACT_EVERY
+        - Best case: O(len(names))
+        """
+
+        self._log(EDIT, old, new)
+        logging = self._logging
+        self._logging = False
+        try:
+            super().edit_mountain(old, new)
+        finally:
+            self._logging = logging
+        self._logged_change()
+
+
+    def sync(self) -> None:
+
+        """
+        - Flushes the logged changes and fsyncs the log, so they survive a crash
+
+        Complexity:
+        - Worst case: O(1) , plus the fsync
+        - Best case: O(1) , when nothing is pending
+        """
+
+        if self._log_file is not None and self._unsynced > 0:
+            self._log_file.flush()
+            os.fsync(self._log_file.fileno())
+            self._unsynced = 0
+
+
+    def compact(self) -> None:
+
+        """
+        - Writes the current state to a new snapshot and starts an empty log from it
+        - A crash at any point leaves either the old snapshot and log, or the new snapshot
+          (and an old log, recognised as such by its version and ignored)
+
+        Complexity:
+        - Worst case: O(S) , where S is the size of the snapshot
+        - Best case: O(S)
+        """
+
+        self.sync()
+        save_snapshot(self, self.snapshot_path)
+
+        if self._log_file is not None:
+            self._log_file.close()
+        self._write_empty_log()
+        self._log_file = open(self.log_path, "ab")
+        self._logged = 0
+
+
+    def close(self) -> None:
+
+        """
+        - Syncs and closes the log; the manager must not be changed afterwards
+
+        Complexity:
+        - Worst case: O(1) , plus the fsync
+        - Best case: O(1)
+        """
+
+        self.sync()
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+        self._logging = False
+
+
+    def _log(self, op: int, *mountains: Mountain) -> None:
+
+        """
+        - Appends a record for a change, unless the change is part of one already logged
+
+        Complexity:
+        - Worst case: O(len(names))
+        - Best case: O(1)
+        """
+
+        if not self._logging:
+            return
+
+        payload = bytearray()
+        for mountain in mountains:
+            name = mountain.name.encode("utf-8")
+            payload += MOUNTAIN.pack(mountain.difficulty_level, mountain.length, len(name))
+            payload += name
+
+        self._log_file.write(RECORD.pack(len(payload), zlib.crc32(bytes([op]) + payload), op))
+        self._log_file.write(payload)
+
+
+    def _logged_change(self) -> None:
+
+        """
+        - Counts a logged change, syncing and compacting when their thresholds are reached
+
+        Complexity:
+        - Worst case: O(S) , when compacting
+        - Best case: O(1)
+        """
+
+        if not self._logging:
+            return
+
+        self._unsynced += 1
+        self._logged += 1
+        if self._logged >= self.COMPACT_EVERY:
+            self.compact()
+        elif self._unsynced >= self.SYNC_EVERY:
+            self.sync()
+
+
+    def _replay(self) -> None:
+
+        """
+        - Applies the records of the log to the state loaded from the snapshot
+        - A log that does not start from the snapshot's version predates it and is discarded;
+          a torn or corrupt tail is cut off
+
+        Complexity:
+        - Worst case: O(R) , where R is the number of records
+        - Best case: O(1) , when there is no log
+        """
+
+        if not os.path.exists(self.log_path):
+            self._write_empty_log()
+            return
+
+        with open(self.log_path, "rb") as f:
+            data = f.read()
+
+        if len(data) < LOG_HEADER.size:
+            self._write_empty_log()
+            return
+        magic, base_version = LOG_HEADER.unpack_from(data, 0)
+        if magic != LOG_MAGIC or base_version != self.version:
+            self._write_empty_log()
+            return
+
+        offset = LOG_HEADER.size
+        while offset + RECORD.size <= len(data):
+            length, crc, op = RECORD.unpack_from(data, offset)
+            start = offset + RECORD.size
+            payload = data[start:start + length]
+            if len(payload) < length or zlib.crc32(bytes([op]) + payload) != crc:
+                break
+
+            mountains = self._decode(payload)
+            if op == ADD:
+                self.add_mountain(mountains[0])
+            elif op == REMOVE:
+                self.remove_mountain(mountains[0])
+            elif op == EDIT:
+                self.edit_mountain(mountains[0], mountains[1])
+            else:
+                break
+            self._logged += 1
+            offset = start + length
+
+        if offset < len(data):
+            with open(self.log_path, "r+b") as f:
+                f.truncate(offset)
+                f.flush()
+                os.fsync(f.fileno())
+
+
+    def _decode(self, payload: bytes) -> list[Mountain]:
+
+        """
+        - Decodes the mountains of a record payload
+
+        Complexity:
+        - Worst case: O(len(payload))
+        - Best case: O(len(payload))
+        """
+
+        mountains : list[Mountain] = []
+        offset = 0
+        while offset < len(payload):
+            difficulty_level, length, name_length = MOUNTAIN.unpack_from(payload, offset)
+            offset += MOUNTAIN.size
+            mountains.append(Mountain(payload[offset:offset + name_length].decode("utf-8"), difficulty_level, length))
+            offset += name_length
+        return mountains
+
+
+    def _write_empty_log(self) -> None:
+
+        """
+        - Replaces the log with an empty one starting from the current version
+
+        Complexity:
+        - Worst case: O(1)
+        - Best case: O(1)
+        """
+
+        temp_path = self.log_path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(LOG_HEADER.pack(LOG_MAGIC, self.version))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.log_path)
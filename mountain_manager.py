@@ -1,6 +1,9 @@
 from mountain import Mountain
 from algorithms.binary_search import binary_search
+from algorithms.mergesort import mergesort
 from double_key_table import DoubleKeyTable
+from data_structures.hash_table import LinearProbeTable
+from data_structures.sorted_block_list import BlockSortedList
 
 
 
@@ -8,16 +11,27 @@ from double_key_table import DoubleKeyTable
 
 class MountainManager:
 
-    def __init__(self) -> None:
+    def __init__(self, secondary_indexes: bool = False) -> None:
 
         """
         defining the magic method : __init__ 
         - This initialises an object of the DoubleKeyTable class
         - The outer key is the difficulty level, inner key is the name and the value is Mountain object
         - It defines the hash function that is to be used
+        - version counts the changes made so far, so derived views can tell when they are stale
+        - The lists returned by mountains_with_difficulty are cached per difficulty, and the order
+          of the difficulties for group_by_difficulty is cached too; a change only drops the cache
+          of its own difficulty, and the order only when a difficulty appears or disappears
+          or the outer hash table is resized
+        - With secondary_indexes, two more indexes are kept up to date on every change:
+            name_index - a LinearProbeTable from name to the entries with that name
+            length_index - a BlockSortedList of the entries sorted by (length , difficulty , name)
+          An entry is a tuple (length , difficulty , name , mountain) recorded when the mountain
+          was added, so it can be found again even if the Mountain object is changed in place
 
         Args:
         - self
+        - secondary_indexes - bool, whether to keep the name and length indexes
         
         Raises:
         - None
@@ -32,6 +46,16 @@ class MountainManager:
         
         self.mountain_table : DoubleKeyTable[int , str , Mountain] = DoubleKeyTable()
         self.mountain_table.hash1 = lambda k: (k % self.mountain_table.table_size)
+        self.version = 0
+        self._views : dict[int, list[Mountain]] = {}
+        self._difficulty_order : list[int]|None = None
+
+        self.secondary_indexes = secondary_indexes
+        self.name_index : LinearProbeTable[str, list[tuple[int, int, str, Mountain]]]|None = None
+        self.length_index : BlockSortedList[tuple[int, int, str, Mountain]]|None = None
+        if secondary_indexes:
+            self.name_index = LinearProbeTable()
+            self.length_index = BlockSortedList(key = lambda entry : entry[:3])
 
 
 
@@ -51,11 +75,21 @@ class MountainManager:
         - None
 
         Complexity:
-        - Worst case: O(1)
+        - Worst case: O(1) , plus O(log(N)) with secondary indexes, where N is the number of mountains
         - Best case: O(1)
         """
 
+        new_difficulty = not self._has_difficulty(mountain.difficulty_level)
+        table_size = self.mountain_table.table_size
+        if self.secondary_indexes:
+            try:
+                # A mountain with the same keys is replaced.
+                self._unindex(self.mountain_table[mountain.difficulty_level , mountain.name], mountain.difficulty_level, mountain.name)
+            except KeyError:
+                pass
+            self._index(mountain)
         self.mountain_table[mountain.difficulty_level , mountain.name] = mountain
+        self._changed(mountain.difficulty_level, new_difficulty or self.mountain_table.table_size != table_size)
         
 
 
@@ -75,15 +109,20 @@ class MountainManager:
         - None
 
         Complexity:
-        - Worst case: O(1)
+        - Worst case: O(1) , plus O(log(N)) with secondary indexes, where N is the number of mountains
         - Best case: O(1)
         """
 
         try:
+            if self.secondary_indexes:
+                # The stored mountain is unindexed, under the keys it was stored with.
+                self._unindex(self.mountain_table[mountain.difficulty_level , mountain.name], mountain.difficulty_level, mountain.name)
             del self.mountain_table[mountain.difficulty_level , mountain.name]
         except KeyError:
             return
         else:
+            # The difficulty disappears with its last mountain, and the cluster after it is moved.
+            self._changed(mountain.difficulty_level, not self._has_difficulty(mountain.difficulty_level))
             return
 
         
@@ -91,7 +130,9 @@ class MountainManager:
     def edit_mountain(self, old: Mountain, new: Mountain) -> None:
 
         """
-        - Removes the old mountain and add the new mountain
+        - Replaces the old mountain with the new mountain
+        - When the keys (difficulty_level , name) are unchanged, the value is overwritten in place
+          in its inner table; only when a key changes is the old mountain removed and the new one added
 
         Args:
         - self
@@ -105,12 +146,41 @@ class MountainManager:
         - None
 
         Complexity:
-        - Worst case: O(1)
+        - Worst case: O(1) , plus O(log(N)) with secondary indexes, where N is the number of mountains
         - Best case: O(1)
         """
 
-        self.remove_mountain(mountain = old)
-        self.add_mountain(mountain = new)
+        if old.difficulty_level == new.difficulty_level and old.name == new.name:
+            # Same slot: setitem on the same keys replaces the value, no delete and re-probe.
+            self.add_mountain(mountain = new)
+        else:
+            self.remove_mountain(mountain = old)
+            self.add_mountain(mountain = new)
+
+
+
+    def edit_many(self, edits: list[tuple[Mountain, Mountain]]) -> None:
+
+        """
+        - Applies a batch of edits, each a tuple (old , new) handled as in edit_mountain, in order
+
+        Args:
+        - self
+        - edits - list of tuple of the old and the new Mountain
+
+        Raises:
+        - None
+
+        Returns:
+        - None
+
+        Complexity:
+        - Worst case: O(E) , plus O(Elog(N)) with secondary indexes, where E is the number of edits
+        - Best case: O(E)
+        """
+
+        for old, new in edits:
+            self.edit_mountain(old = old, new = new)
 
 
     
@@ -130,12 +200,19 @@ class MountainManager:
         - List of Mountain
 
         Complexity:
-        - Worst case: O(1)
-        - Best case: O(1)
+        - Worst case: O(N) , where N is the size of the outer hash table, when the view is not cached
+        - Best case: O(M) , where M is the number of mountains returned, when the view is cached
         """
 
-        same_diff_mountain : list[Mountain] = self.mountain_table.values(diff)
-        return same_diff_mountain
+        same_diff_mountain = self._views.get(diff)
+        if same_diff_mountain is None:
+            same_diff_mountain = self.mountain_table.values(diff)
+            # Only difficulties that exist are cached, so polling absent ones cannot grow the cache.
+            if len(same_diff_mountain) > 0:
+                self._views[diff] = same_diff_mountain
+
+        # A copy, so callers cannot change the cached view.
+        return list(same_diff_mountain)
 
           
 
@@ -155,22 +232,193 @@ class MountainManager:
 
         Complexity:
         - Worst case: O(N) , where N is the number of elements in the outer hash table - self.mountain_table
-        - Best case: O(1)
+        - Best case: O(M) , where M is the number of mountains, when every view is cached
         """
 
+        if self._difficulty_order is None:
+            self._difficulty_order = self.mountain_table.keys()
+
         grouped_list_diff : list[list[Mountain]] = []
-        all_diff_iter = self.mountain_table.iter_keys(None)
+        for diff in self._difficulty_order:
+            grouped_list_diff.append(self.mountains_with_difficulty(diff))
+
+        return grouped_list_diff
+
+
 
-        while True:
+    def find_by_name(self, name: str) -> list[Mountain]:
+
+        """
+        - Returns all mountains with the given name (at most one per difficulty)
+        - Without secondary indexes, every difficulty is probed for the name
+
+        Args:
+        - self
+        - name - str
+
+        Raises:
+        - None
+
+        Returns:
+        - List of Mountain, in no particular order
+
+        Complexity:
+        - Worst case: O(N) , where N is the number of difficulties, without secondary indexes
+        - Best case: O(len(name) + M) , where M is the number of mountains returned, with secondary indexes
+        """
+
+        if self.secondary_indexes:
+            try:
+                entries = self.name_index[name]
+            except KeyError:
+                return []
+            return [entry[3] for entry in entries]
+
+        result : list[Mountain] = []
+        for diff in self.mountain_table.keys():
             try:
-                key = next(all_diff_iter)
-                
-            except StopIteration:
+                result.append(self.mountain_table[diff , name])
+            except KeyError:
+                pass
+        return result
+
+
+
+    def mountains_in_length_range(self, lo: int, hi: int) -> list[Mountain]:
+
+        """
+        - Returns the mountains with lo <= length <= hi, sorted by (length , difficulty , name)
+        - Without secondary indexes, every mountain is scanned and the matches sorted
+
+        Args:
+        - self
+        - lo - int, the smallest length
+        - hi - int, the largest length
+
+        Raises:
+        - None
+
+        Returns:
+        - List of Mountain
+
+        Complexity:
+        - Worst case: O(N + Mlog(M)) , where N is the number of mountains and M the number returned, without secondary indexes
+        - Best case: O(log(N) + M) , with secondary indexes
+        """
+
+        if self.secondary_indexes:
+            result : list[Mountain] = []
+            # (lo,) sorts before every (lo, difficulty, name) key.
+            for key, entry in self.length_index.iter_from(self.length_index.bisect_key_left((lo,))):
+                if key[0] > hi:
+                    break
+                result.append(entry[3])
+            return result
+
+        matches = [mountain for mountain in self.mountain_table.values() if lo <= mountain.length <= hi]
+        return mergesort(matches, key = lambda m : (m.length , m.difficulty_level , m.name))
+
+
+
+    def _index(self, mountain: Mountain) -> None:
+
+        """
+        - Adds an entry for the mountain to the secondary indexes
+
+        Complexity:
+        - Worst case: O(len(name) + log(N)) , where N is the number of mountains
+        - Best case: O(len(name) + log(N))
+        """
+
+        entry = (mountain.length , mountain.difficulty_level , mountain.name , mountain)
+        try:
+            self.name_index[mountain.name].append(entry)
+        except KeyError:
+            self.name_index[mountain.name] = [entry]
+        self.length_index.add(entry)
+
+
+
+    def _unindex(self, stored: Mountain, diff: int, name: str) -> None:
+
+        """
+        - Removes the entry of the stored mountain, added under (diff , name), from the secondary indexes
+
+        Complexity:
+        - Worst case: O(len(name) + log(N) + M) , where N is the number of mountains and M the number named name
+        - Best case: O(len(name) + log(N))
+        """
+
+        entries = self.name_index[name]
+        for i in range(len(entries)):
+            if entries[i][3] is stored and entries[i][1] == diff:
+                entry = entries.pop(i)
+                self.length_index.remove(entry)
                 break
-            
-            else:
-                mount_value = self.mountain_table.values(key = key)
-                grouped_list_diff.append(mount_value)
 
-        return grouped_list_diff
-        
\ No newline at end of file
+        if len(entries) == 0:
+            del self.name_index[name]
+
+
+
+    def _has_difficulty(self, diff: int) -> bool:
+
+        """
+        - Returns whether the outer hash table has a slot for difficulty 'diff', probing it as
+          DoubleKeyTable does; an outer slot is freed when its last mountain is removed
+
+        Args:
+        - self
+        - diff - int
+
+        Raises:
+        - None
+
+        Returns:
+        - bool
+
+        Complexity:
+        - Worst case: O(N) , where N is the size of the outer hash table
+        - Best case: O(1)
+        """
+
+        table = self.mountain_table
+        position = table.hash1(diff)
+        for _ in range(table.table_size):
+            item = table.outer_hash_table[position]
+            if item is None:
+                return False
+            if item[0] == diff:
+                return True
+            position = (position + 1) % table.table_size
+        return False
+
+
+
+    def _changed(self, diff: int, order_changed: bool) -> None:
+
+        """
+        - Records a change to the mountains with difficulty 'diff'
+        - Drops the cached view of that difficulty, and the difficulty order when order_changed
+
+        Args:
+        - self
+        - diff - int
+        - order_changed - bool, whether a difficulty appeared or disappeared, or the outer
+          hash table was resized, so its slots are no longer in the cached order
+
+        Raises:
+        - None
+
+        Returns:
+        - None
+
+        Complexity:
+        - Worst case: O(1)
+        - Best case: O(1)
+        """
+
+        self.version += 1
+        self._views.pop(diff, None)
+        if order_changed:
+            self._difficulty_order = None
@@ -1,18 +1,27 @@
 from __future__ import annotations
 
+import json
+from typing import Iterable
+
 from mountain import Mountain
-from algorithms.mergesort import mergesort , merge
-from algorithms.binary_search import binary_search
+from algorithms.mergesort import natural_mergesort_keyed , merge_keyed
+from algorithms.external_sort import merge_k , external_mergesort
+from algorithms.binary_search import search_many
+from data_structures.sorted_block_list import BlockSortedList
 
 class MountainOrganiser:
 
+    # Batches at least this fraction of the organiser's size are merged in one O(N) pass;
+    # smaller batches are inserted one by one into the blocked sorted list.
+    BULK_MERGE_RATIO = 0.25
+
     def __init__(self) -> None:
 
         """
         defining the magic method : __init__ 
-        - It creates a list of Mountain objects
-        - This list is expected to be sorted in the order : tuple(length , name)
-        - The index in the list is the rank of the mountain
+        - It creates a blocked sorted list of Mountain objects
+        - This list is sorted in the order : tuple(length , name)
+        - The position in the list is the rank of the mountain
 
         Args:
         - self
@@ -28,7 +37,35 @@ class MountainOrganiser:
         - Best case: O(1)
         """
 
-        self.sorted_mountain_list : list[Mountain] = []
+        self.ranking : BlockSortedList[Mountain] = BlockSortedList(key = lambda a : (a.length , a.name))
+
+
+    @property
+    def sorted_mountain_list(self) -> list[Mountain]:
+
+        """
+        - Returns all mountains included so far, in rank order
+
+        Complexity:
+        - Worst case: O(N) , where N is the total number of mountains included so far
+        - Best case: O(N)
+        """
+
+        return list(self.ranking)
+
+
+    @property
+    def sorted_keys(self) -> list[tuple[int, str]]:
+
+        """
+        - Returns the precomputed (length , name) keys, aligned with sorted_mountain_list
+
+        Complexity:
+        - Worst case: O(N) , where N is the total number of mountains included so far
+        - Best case: O(N)
+        """
+
+        return list(self.ranking.keys())
 
 
     def cur_position(self, mountain: Mountain) -> int:
@@ -51,10 +88,50 @@ class MountainOrganiser:
         - Best case: O(1)
         """
          
-        rank = binary_search (l = self.sorted_mountain_list, item = mountain, key = lambda a : (a.length , a.name))
+        rank = self.ranking.index(mountain)
         return rank
 
 
+    def positions(self, mountains: list[Mountain]) -> list[int]:
+
+        """
+        - Finds the ranks of many mountains at once, in the order they are given
+        - The queries are sorted and looked up together with search_many, instead of one cur_position
+          call each: small batches bisect the ranking once per query, large batches walk its keys
+          once alongside the queries (without copying them out)
+
+        Args:
+        - self
+        - mountains - list of Mountain objects
+
+        Raises:
+        - Raises KeyError if one of the Mountain objects is not added yet
+
+        Returns:
+        - list of int - the rank of each mountain
+
+        Complexity:
+        - Worst case: O(Mlog(M) + min(N + M, Mlog(N))) , where M is the length of the input list, and N is the total number of mountains included so far
+        - Best case: O(M + Mlog(N)) , when the queries are already sorted and M is small compared to N
+        """
+
+        query_keys = [self.ranking.key(mountain) for mountain in mountains]
+        order, sorted_queries = natural_mergesort_keyed(l = list(range(len(mountains))), key = lambda i : query_keys[i])
+
+        def find_key(query) -> int|None:
+            rank = self.ranking.bisect_key_left(query)
+            return rank if self.ranking.bisect_key_right(query) > rank else None
+
+        found = search_many(self.ranking.keys(), sorted_queries, length = len(self.ranking), find_key = find_key)
+
+        result : list[int] = [0] * len(mountains)
+        for i, rank in zip(order, found):
+            if rank is None:
+                raise KeyError("Item", mountains[i], "does not exist")
+            result[i] = rank
+        return result
+
+
     def add_mountains(self, mountains: list[Mountain]) -> None:
 
         """
@@ -72,9 +149,187 @@ class MountainOrganiser:
 
         Complexity:
         - Worst case: O(Mlog(M) + N), where M is the length of the input list, and N is the total number of mountains included so far
+        - Best case: O(Mlog(M) + M log(N)), when M is small compared to N and the batch is inserted one by one
+        """
+
+        # Each (length, name) key is built once here and then carried alongside its mountain.
+        # Batches usually arrive nearly sorted, which the natural mergesort handles in about O(M).
+        temp_sort, temp_keys = natural_mergesort_keyed(l = mountains, key = self.ranking.key) # O(Mlog(M))
+
+        if len(temp_sort) >= self.BULK_MERGE_RATIO * len(self.ranking):
+            # Existing mountains first, so ties rank the same way as single inserts.
+            temp_merge, merge_keys = merge_keyed(l1 = list(self.ranking) , keys1 = list(self.ranking.keys()) , l2 = temp_sort , keys2 = temp_keys) # O(N)
+            self.ranking = BlockSortedList.from_sorted(temp_merge, key = self.ranking.key, keys = merge_keys)
+        else:
+            self.ranking.update(temp_sort, keys = temp_keys) # O(Mlog(N))
+ 
+
+
+    def __len__(self) -> int:
+
+        """
+        Returns the number of mountains in the organiser
+
+        Complexity:
+        - Worst case: O(1)
         - Best case: O(1)
         """
 
-        temp_sort = mergesort(l = mountains, key = lambda a : (a.length , a.name)) # O(Mlog(M))
-        self.sorted_mountain_list = merge(l1 = temp_sort , l2 = self.sorted_mountain_list , key = lambda a : (a.length , a.name)) # O(N)
- 
\ No newline at end of file
+        return len(self.ranking)
+
+
+    def remove_mountain(self, mountain: Mountain) -> None:
+
+        """
+        - Removes a mountain from the organiser; every mountain ranked after it moves up by one
+
+        Args:
+        - self
+        - mountain - of Mountain class
+
+        Raises:
+        - Raises KeyError if the Mountain object is not added yet
+
+        Returns:
+        - None
+
+        Complexity:
+        - Worst case: O(log(N) + B) , where N is the total number of mountains and B the block size of the ranking
+        - Best case: O(log(N))
+        """
+
+        self.ranking.remove(mountain)
+
+
+    def mountain_at(self, rank: int) -> Mountain:
+
+        """
+        - Returns the mountain with the given rank (the inverse of cur_position)
+
+        Args:
+        - self
+        - rank - int
+
+        Raises:
+        - Raises IndexError if no mountain has that rank
+
+        Returns:
+        - Mountain
+
+        Complexity:
+        - Worst case: O(log(N)) , where N is the total number of mountains included so far
+        - Best case: O(log(N))
+        """
+
+        return self.ranking.select(rank)
+
+
+    def mountains_in_length_range(self, lo: int, hi: int) -> list[Mountain]:
+
+        """
+        - Returns the mountains with lo <= length <= hi, in rank order
+
+        Args:
+        - self
+        - lo - int, the smallest length
+        - hi - int, the largest length
+
+        Raises:
+        - None
+
+        Returns:
+        - List of Mountain
+
+        Complexity:
+        - Worst case: O(log(N) + M) , where N is the total number of mountains and M the number returned
+        - Best case: O(log(N))
+        """
+
+        result : list[Mountain] = []
+
+        # (lo,) sorts before every (lo, name) key.
+        for key, mountain in self.ranking.iter_from(self.ranking.bisect_key_left((lo,))):
+            if key[0] > hi:
+                break
+            result.append(mountain)
+
+        return result
+
+
+    def add_sorted_stream(self, mountains: Iterable[Mountain]) -> None:
+
+        """
+        - Adds a stream of mountains already sorted by (length , name), in a single merge pass
+        - The stream is consumed lazily, e.g. straight from external_mergesort, and the merged
+          ranking is built block by block, so besides the mountains only O(1) blocks are held
+
+        Args:
+        - self
+        - mountains - iterable of Mountain objects, sorted by (length , name)
+
+        Raises:
+        - Any error raised while reading the stream, once the mountains read before it are added
+
+        Returns:
+        - None
+
+        Complexity:
+        - Worst case: O(M + N) , where M is the number of streamed mountains and N the number already included
+        - Best case: O(M + N)
+        """
+
+        key = self.ranking.key
+        failure : list[Exception] = []
+
+        def stream() -> Iterable[tuple[tuple[int, str], Mountain]]:
+            # A failing stream ends the merge early instead of abandoning it, so no existing
+            # mountain is lost with the old ranking's released blocks.
+            try:
+                for mountain in mountains:
+                    yield key(mountain), mountain
+            except Exception as error:
+                failure.append(error)
+
+        # Existing mountains come first on ties, as in add_mountains. The new ranking is built
+        # a block at a time while the old one gives up its blocks, so the mountains are held once.
+        merged = merge_k([self.ranking.drain(), stream()], key = lambda pair : pair[0])
+        self.ranking = BlockSortedList.from_sorted_pairs(merged, key = key)
+
+        if len(failure) > 0:
+            raise failure[0]
+
+
+    def add_mountains_external(self, mountains: Iterable[Mountain], run_size: int = 100000, directory: str|None = None) -> None:
+
+        """
+        - Adds a stream of mountains too large to sort in memory
+        - The stream is sorted with external_mergesort (runs of run_size mountains spilled to
+          temporary files in directory), then merged in with add_sorted_stream
+        - When the stream fits in a single run it is never written out, and the organiser holds the
+          original Mountain objects; otherwise it holds equal copies read back from the temporary files
+
+        Args:
+        - self
+        - mountains - iterable of Mountain objects, in any order
+        - run_size - int, the number of mountains sorted in memory at once
+        - directory - str or None, where to put the temporary files (None for the system default)
+
+        Raises:
+        - None
+
+        Returns:
+        - None
+
+        Complexity:
+        - Worst case: O(Mlog(M) + N) , where M is the number of streamed mountains and N the number already included
+        - Best case: O(Mlog(M) + N)
+        """
+
+        self.add_sorted_stream(external_mergesort(
+            mountains,
+            key = self.ranking.key,
+            run_size = run_size,
+            encode = lambda a : json.dumps([a.name, a.difficulty_level, a.length]),
+            decode = lambda line : Mountain(*json.loads(line)),
+            directory = directory,
+            ))
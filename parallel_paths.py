@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
+
+from mountain import Mountain
+from trail import Trail
+from constants import SERIES_KIND, SPLIT_KIND
+from compiled_trail import CompiledTrail
+
+"""
+Parallel path enumeration.
+
+The decision space of a trail is split on the first few branch decisions: every prefix of
+top/bottom choices is an independent task. Workers receive the compiled node arrays once
+(CompiledTrail.encode) and return paths as tuples of mountain indices, which are mapped back
+to Mountain objects here. Results come back in the same order as Trail.collect_mountain_list.
+"""
+
+# The compiled trail held by each worker process, set once by _init_worker.
+_worker_trail : CompiledTrail|None = None
+
+
+def _init_worker(encoding: tuple) -> None:
+
+    """
+    - Decodes the shipped trail once per worker process
+
+    Complexity:
+    - Worst case: O(N) , where N is the number of compiled nodes
+    - Best case: O(N)
+    """
+
+    global _worker_trail
+    _worker_trail = CompiledTrail.decode(encoding)
+
+
+def _paths_with_prefix(task: tuple[tuple[bool, ...], int|None]) -> list[tuple[int, ...]]:
+
+    """
+    - Worker task: every path starting with the given branch decisions, optionally only those of length k
+
+    Complexity:
+    - Worst case: O(P * L) , where P is the number of paths with this prefix and L the longest path
+    - Best case: O(L)
+    """
+
+    prefix, k = task
+    if k is None:
+        return list(_worker_trail.iter_paths(prefix = prefix))
+    return [path for path in _worker_trail.iter_paths(prefix = prefix, max_length = k) if len(path) == k]
+
+
+def decision_prefixes(compiled: CompiledTrail, depth: int) -> list[tuple[bool, ...]]:
+
+    """
+    - Partitions the paths of a compiled trail by their first `depth` branch decisions
+    - Paths that end after fewer decisions get a shorter prefix, so every path matches exactly one prefix
+
+    Args:
+    - compiled - of CompiledTrail class
+    - depth - int, the number of decisions to fix
+
+    Raises:
+    - None
+
+    Returns:
+    - list of tuple of bool (True = top), in collect_mountain_list order
+
+    Complexity:
+    - Worst case: O(2^depth * N) , where N is the number of compiled nodes
+    - Best case: O(N) , when the trail has no splits
+    """
+
+    kind, next_node, top, bottom = compiled.kind, compiled.next_node, compiled.top, compiled.bottom
+
+    prefixes : list[tuple[bool, ...]] = []
+    stack : list[tuple[int, tuple|None, tuple[bool, ...]]] = [(compiled.root, None, ())]
+
+    while len(stack) > 0:
+        node, cont, decisions = stack.pop()
+
+        while True:
+            if kind[node] == SERIES_KIND:
+                node = next_node[node]
+
+            elif kind[node] == SPLIT_KIND:
+                if len(decisions) == depth:
+                    prefixes.append(decisions)
+                    break
+                cont = (next_node[node], cont)
+                stack.append((bottom[node], cont, decisions + (False,)))
+                node = top[node]
+                decisions = decisions + (True,)
+
+            elif cont is None:
+                prefixes.append(decisions)
+                break
+
+            else:
+                node, cont = cont
+
+    return prefixes
+
+
+def iter_mountain_paths_parallel(trail: Trail|CompiledTrail, k: int|None = None, max_workers: int|None = None, depth: int|None = None) -> Iterator[list[Mountain]]:
+
+    """
+    - Streams the paths of the trail, enumerated in parallel by a process pool
+    - Paths are yielded in the same order as Trail.collect_mountain_list, as each task completes
+
+    Args:
+    - trail - of Trail or CompiledTrail class
+    - k - int or None, only yield paths of exactly k mountains
+    - max_workers - int or None, the number of worker processes (defaults to the CPU count)
+    - depth - int or None, the number of branch decisions used to split the work
+              (defaults to enough for about four tasks per worker)
+
+    Raises:
+    - None
+
+    Returns:
+    - Iterator of list of Mountain
+
+    Complexity:
+    - Worst case: O(P * L / W) per worker, where P is the number of paths, L the longest path and W the number of workers
+    - Best case: O(L)
+    """
+
+    compiled = trail if isinstance(trail, CompiledTrail) else trail.compile()
+    mountains = compiled.mountains
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if depth is None:
+        depth = math.ceil(math.log2(4 * max_workers))
+
+    tasks = [(prefix, k) for prefix in decision_prefixes(compiled, depth)]
+
+    with ProcessPoolExecutor(max_workers = max_workers, initializer = _init_worker, initargs = (compiled.encode(),)) as executor:
+        for paths in executor.map(_paths_with_prefix, tasks):
+            for path in paths:
+                yield [mountains[i] for i in path]
+
+
+def collect_mountain_list_parallel(trail: Trail|CompiledTrail, max_workers: int|None = None) -> list[list[Mountain]]:
+
+    """
+    - Parallel equivalent of Trail.collect_mountain_list
+
+    Args:
+    - trail - of Trail or CompiledTrail class
+    - max_workers - int or None, the number of worker processes
+
+    Raises:
+    - None
+
+    Returns:
+    - A list of list of Mountain
+
+    Complexity:
+    - See iter_mountain_paths_parallel
+    """
+
+    return list(iter_mountain_paths_parallel(trail, max_workers = max_workers))
+
+
+def length_k_paths_parallel(trail: Trail|CompiledTrail, k: int, max_workers: int|None = None) -> list[list[Mountain]]:
+
+    """
+    - Parallel equivalent of Trail.length_k_paths, with paths filtered inside the workers
+
+    Args:
+    - trail - of Trail or CompiledTrail class
+    - k - int, the number of mountains on each returned path
+    - max_workers - int or None, the number of worker processes
+
+    Raises:
+    - None
+
+    Returns:
+    - A list of list of Mountain
+
+    Complexity:
+    - See iter_mountain_paths_parallel
+    """
+
+    return list(iter_mountain_paths_parallel(trail, k = k, max_workers = max_workers))
@@ -1,14 +1,38 @@
 from abc import ABC, abstractmethod
 from mountain import Mountain
 from trail import Trail
+from branch_stats import BranchMemo, BranchStats
+from recorders import MountainRecorder, ListRecorder
+from constants import SERIES_KIND
+
+def _is_series(store) -> bool:
+    # The KIND tag is inherited by subclasses such as draw_trails.TrailSeriesBox,
+    # and does not depend on which import of trail.py created the node.
+    return getattr(store, "KIND", None) == SERIES_KIND
 
 class WalkerPersonality(ABC):
 
-    def __init__(self) -> None:
-        self.mountains = []
+    def __init__(self, recorder: MountainRecorder|None = None) -> None:
+        # What is kept of the visited mountains, see recorders.py.
+        self.recorder = recorder if recorder is not None else ListRecorder()
+
+    @property
+    def mountains(self) -> list[Mountain]:
+        # Only available with recorders that keep mountains (ListRecorder, RingRecorder).
+        try:
+            return self.recorder.mountains
+        except AttributeError:
+            raise AttributeError(f"{type(self).__name__} records with {type(self.recorder).__name__}, which keeps no mountain list") from None
+
+    @mountains.setter
+    def mountains(self, mountains: list[Mountain]) -> None:
+        # Assigning a list (e.g. to reset a walker) records into that list from then on.
+        recorder = ListRecorder()
+        recorder.mountains = mountains
+        self.recorder = recorder
 
     def add_mountain(self, mountain: Mountain) -> None:
-        self.mountains.append(mountain)
+        self.recorder.record(mountain)
 
     @abstractmethod
     def select_branch(self, top_branch: Trail, bottom_branch: Trail) -> bool:
@@ -32,11 +56,47 @@ class LazyWalker(WalkerPersonality):
         """
 
         # isinstance breaks across imports if running the original file as main
-        # So just check __class__.__name__ :(
-        top_m = top_branch.store.__class__.__name__ == "TrailSeries"
-        bot_m = bottom_branch.store.__class__.__name__ == "TrailSeries"
+        # So check the node's KIND tag instead.
+        top_m = _is_series(top_branch.store)
+        bot_m = _is_series(bottom_branch.store)
         if top_m and bot_m:
             return top_branch.store.mountain.difficulty_level < bottom_branch.store.mountain.difficulty_level
         # If one of them has a mountain, don't take it.
         # If neither do, then take the top branch.
         return not top_m
+
+class LookaheadWalker(WalkerPersonality):
+    """
+    A walker that decides using aggregates of each whole branch
+    (see branch_stats.BranchStats) rather than just its first mountain.
+
+    The aggregates come from a BranchMemo, computed once per trail node.
+    Share one memo between walkers on the same trail so no subtree is walked twice.
+    """
+
+    def __init__(self, memo: BranchMemo|None = None, recorder: MountainRecorder|None = None) -> None:
+        super().__init__(recorder)
+        self.memo = memo if memo is not None else BranchMemo()
+
+    def select_branch(self, top_branch: Trail, bottom_branch: Trail) -> bool:
+        return self.prefer_top(self.memo.stats(top_branch), self.memo.stats(bottom_branch))
+
+    @abstractmethod
+    def prefer_top(self, top_stats: BranchStats, bottom_stats: BranchStats) -> bool:
+        raise NotImplementedError()
+
+class EasiestRouteWalker(LookaheadWalker):
+    def prefer_top(self, top_stats: BranchStats, bottom_stats: BranchStats) -> bool:
+        """
+        Take the branch whose best path has the lowest total score
+        (total difficulty with the default memo). Ties go to the top branch.
+        """
+        return self.memo.best(top_stats.best_score, bottom_stats.best_score) == top_stats.best_score
+
+class ShortestBranchWalker(LookaheadWalker):
+    def prefer_top(self, top_stats: BranchStats, bottom_stats: BranchStats) -> bool:
+        """
+        Take the branch with the least total length of mountains on it.
+        Ties go to the top branch.
+        """
+        return top_stats.total_length <= bottom_stats.total_length
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from mountain import Mountain
+from mountain_manager import MountainManager
+from algorithms.mergesort import natural_mergesort_keyed
+
+"""
+Rank trajectories of mountains as the difficulty groups of a MountainManager are added,
+one group at a time, to a MountainOrganiser (ranked by (length , name)).
+
+Rather than building an organiser and asking every mountain for its rank after every group,
+all mountains are sorted by (length , name) once. The rank of a mountain after group i is the
+number of mountains from groups 0..i with a smaller key, which one pass over the sorted order
+with a running count gives for every mountain at once.
+"""
+
+
+class RankHistory:
+
+    def __init__(self, manager: MountainManager) -> None:
+
+        """
+        defining the magic method : __init__
+        - Remembers the manager; nothing is computed until histories is called
+
+        Args:
+        - self
+        - manager - of MountainManager class
+
+        Raises:
+        - None
+
+        Returns:
+        - None
+
+        Complexity:
+        - Worst case: O(1)
+        - Best case: O(1)
+        """
+
+        self.manager = manager
+        self._version : int|None = None
+        self._histories : list[tuple[Mountain, int, list[int]]] = []
+
+
+    def histories(self) -> list[tuple[Mountain, int, list[int]]]:
+
+        """
+        - Returns, for every mountain in group_by_difficulty order, a tuple of:
+            the mountain,
+            the index of its difficulty group,
+            its rank after its own group and after each later group was added
+        - The result is cached until the manager changes
+
+        Args:
+        - self
+
+        Raises:
+        - None
+
+        Returns:
+        - list of tuple of Mountain, int and list of int
+
+        Complexity:
+        - Worst case: O(Nlog(N) + G * N) , where N is the number of mountains and G the number of groups
+        - Best case: O(1) , when the manager has not changed since the last call
+        """
+
+        if self._version != self.manager.version:
+            self._histories = self._compute()
+            self._version = self.manager.version
+        return self._histories
+
+
+    def _compute(self) -> list[tuple[Mountain, int, list[int]]]:
+
+        """
+        - Computes every rank trajectory from scratch
+
+        Complexity:
+        - Worst case: O(Nlog(N) + G * N) , where N is the number of mountains and G the number of groups
+        - Best case: O(N) , when there is at most one group and the mountains are already sorted
+        """
+
+        groups = self.manager.group_by_difficulty()
+
+        result : list[tuple[Mountain, int, list[int]]] = []
+        for group_index, group in enumerate(groups):
+            for mountain in group:
+                result.append((mountain, group_index, []))
+
+        keys = [(mountain.length , mountain.name) for mountain, _, _ in result]
+        order, sorted_keys = natural_mergesort_keyed(l = list(range(len(result))), key = lambda i : keys[i])
+
+        for group_index in range(len(groups)):
+            # Mountains from groups 0..group_index seen so far with a strictly smaller key.
+            smaller = 0
+            start = 0
+            while start < len(order):
+                # Equal keys share a rank, as with MountainOrganiser.cur_position.
+                end = start
+                added = 0
+                while end < len(order) and sorted_keys[end] == sorted_keys[start]:
+                    entry = result[order[end]]
+                    if entry[1] <= group_index:
+                        entry[2].append(smaller)
+                        added += 1
+                    end += 1
+                smaller += added
+                start = end
+
+        return result
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Callable
+
+from mountain import Mountain
+
+"""
+Recorders decide what a WalkerPersonality keeps of the mountains it visits.
+Pass one to the personality's constructor; the default keeps the full list.
+"""
+
+class MountainRecorder(ABC):
+
+    @abstractmethod
+    def record(self, mountain: Mountain) -> None:
+        """
+        Records one visited mountain.
+        :complexity: O(1) for every recorder in this module.
+        """
+        raise NotImplementedError()
+
+class ListRecorder(MountainRecorder):
+    """Keeps every visited mountain, in order."""
+
+    def __init__(self) -> None:
+        self.mountains : list[Mountain] = []
+
+    def record(self, mountain: Mountain) -> None:
+        self.mountains.append(mountain)
+
+class CountRecorder(MountainRecorder):
+    """Only counts the visited mountains."""
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def record(self, mountain: Mountain) -> None:
+        self.count += 1
+
+class AggregateRecorder(MountainRecorder):
+    """Keeps running totals of the visited mountains."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_length = 0
+        self.total_difficulty = 0
+        self.max_difficulty : int|None = None
+
+    def record(self, mountain: Mountain) -> None:
+        self.count += 1
+        self.total_length += mountain.length
+        self.total_difficulty += mountain.difficulty_level
+        if self.max_difficulty is None or mountain.difficulty_level > self.max_difficulty:
+            self.max_difficulty = mountain.difficulty_level
+
+class RingRecorder(MountainRecorder):
+    """Keeps only the last `size` visited mountains."""
+
+    def __init__(self, size: int) -> None:
+        self._ring : deque[Mountain] = deque(maxlen=size)
+
+    @property
+    def mountains(self) -> list[Mountain]:
+        """
+        The kept mountains, oldest first.
+        :complexity: O(size)
+        """
+        return list(self._ring)
+
+    def record(self, mountain: Mountain) -> None:
+        self._ring.append(mountain)
+
+class CallbackRecorder(MountainRecorder):
+    """Streams every visited mountain to a callback and keeps nothing."""
+
+    def __init__(self, callback: Callable[[Mountain], None]) -> None:
+        self.callback = callback
+
+    def record(self, mountain: Mountain) -> None:
+        self.callback(mountain)
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import heapq
+from typing import Callable
+
+from mountain import Mountain
+from trail import Trail, TrailSeries
+from branch_stats import BranchMemo
+
+"""
+Best routes through a trail under an additive objective: the score of a path is the sum of
+score(mountain) over its mountains. Both solvers work bottom-up over the trail instead of
+enumerating every path with collect_mountain_list.
+
+Paths are built as shared linked pieces while solving and only turned into lists at the end:
+    None                        the empty path
+    (mountain, rest)            a mountain followed by the path rest
+    (None, first, second)       the path first followed by the path second
+"""
+
+
+def best_path(trail: Trail, score: Callable[[Mountain], float]|None = None, maximise: bool|None = None, memo: BranchMemo|None = None) -> tuple[float, list[Mountain]]:
+
+    """
+    - Returns the best path through the trail and its score
+    - Ties are broken towards the top branch, so the result is the first best path in
+      collect_mountain_list order
+
+    Args:
+    - trail - of Trail class
+    - score - function giving the score of one mountain, summed along the path, or None for
+      the memo's score (the difficulty level without a memo)
+    - maximise - bool, whether the best path has the highest (True) or lowest (False) score,
+      or None for the memo's (False without a memo)
+    - memo - BranchMemo or None, an existing memo to reuse; the objective is taken from it
+
+    Raises:
+    - ValueError if score or maximise is given and differs from the memo's
+
+    Returns:
+    - tuple of the best score and the path as a list of Mountain
+
+    Complexity:
+    - Worst case: O(N) , where N is the number of nodes in the trail
+    - Best case: O(1) , when the trail is empty
+    """
+
+    if memo is None:
+        if score is None:
+            memo = BranchMemo(maximise = maximise == True)
+        else:
+            memo = BranchMemo(score = score, maximise = maximise == True)
+    elif score is not None and score is not memo.score:
+        raise ValueError("score differs from the memo's score")
+    elif maximise is not None and maximise != memo.maximise:
+        raise ValueError("maximise differs from the memo's maximise")
+
+    path : list[Mountain] = []
+    stack : list[Trail] = [trail]
+
+    # Walk the trail once more, taking the better branch at every split.
+    while len(stack) > 0:
+        node = stack.pop()
+
+        while node.store is not None:
+            store = node.store
+            if isinstance(store, TrailSeries):
+                path.append(store.mountain)
+                node = store.following
+            else:
+                stack.append(store.path_follow)
+                top_score = memo.stats(store.path_top).best_score
+                bottom_score = memo.stats(store.path_bottom).best_score
+                if memo.best(top_score, bottom_score) == top_score:
+                    node = store.path_top
+                else:
+                    node = store.path_bottom
+
+    return (memo.stats(trail).best_score, path)
+
+
+def top_k_paths(trail: Trail, k: int, score: Callable[[Mountain], float] = lambda m: m.difficulty_level, maximise: bool = False) -> list[tuple[float, list[Mountain]]]:
+
+    """
+    - Returns the k best paths through the trail with their scores, best first
+    - Fewer than k paths are returned when the trail has fewer paths
+
+    Args:
+    - trail - of Trail class
+    - k - int, the number of paths wanted
+    - score - function giving the score of one mountain, summed along the path
+    - maximise - bool, whether the best paths have the highest (True) or lowest (False) score
+
+    Raises:
+    - None
+
+    Returns:
+    - A list of tuple of score and path (list of Mountain)
+
+    Complexity:
+    - Worst case: O(N * k * log(k) + k * L) , where N is the number of nodes and L the longest path
+    - Best case: O(1) , when k is 0
+    """
+
+    if k <= 0:
+        return []
+
+    # Internally lower is always better.
+    sign = -1 if maximise else 1
+
+    # id(node) -> the k best (internal score, path) of that node, best first.
+    best : dict[int, list[tuple[float, object]]] = {}
+    stack : list[tuple[Trail, bool]] = [(trail, False)]
+
+    while len(stack) > 0:
+        node, children_done = stack.pop()
+
+        if id(node) in best:
+            continue
+
+        store = node.store
+
+        if store is None:
+            best[id(node)] = [(0, None)]
+
+        elif not children_done:
+            stack.append((node, True))
+            if isinstance(store, TrailSeries):
+                stack.append((store.following, False))
+            else:
+                stack.append((store.path_follow, False))
+                stack.append((store.path_bottom, False))
+                stack.append((store.path_top, False))
+
+        elif isinstance(store, TrailSeries):
+            weight = sign * score(store.mountain)
+            best[id(node)] = [(value + weight, (store.mountain, path)) for value, path in best[id(store.following)]]
+
+        else:
+            branches = _merge_best(best[id(store.path_top)], best[id(store.path_bottom)], k)
+            best[id(node)] = _best_sums(branches, best[id(store.path_follow)], k)
+
+    return [(sign * value, _materialise(path)) for value, path in best[id(trail)]]
+
+
+def _merge_best(first: list[tuple[float, object]], second: list[tuple[float, object]], k: int) -> list[tuple[float, object]]:
+
+    """
+    - The k best of two best-first lists, preferring first on ties
+
+    Complexity:
+    - Worst case: O(k)
+    - Best case: O(1)
+    """
+
+    merged : list[tuple[float, object]] = []
+    i = j = 0
+
+    while len(merged) < k and (i < len(first) or j < len(second)):
+        if j == len(second) or (i < len(first) and first[i][0] <= second[j][0]):
+            merged.append(first[i])
+            i += 1
+        else:
+            merged.append(second[j])
+            j += 1
+
+    return merged
+
+
+def _best_sums(first: list[tuple[float, object]], second: list[tuple[float, object]], k: int) -> list[tuple[float, object]]:
+
+    """
+    - The k best concatenations of a path from first with a path from second, best first
+
+    Complexity:
+    - Worst case: O(k * log(k))
+    - Best case: O(1)
+    """
+
+    result : list[tuple[float, object]] = []
+    heap : list[tuple[float, int, int]] = [(first[0][0] + second[0][0], 0, 0)]
+    seen : set[tuple[int, int]] = {(0, 0)}
+
+    while len(heap) > 0 and len(result) < k:
+        value, i, j = heapq.heappop(heap)
+        result.append((value, (None, first[i][1], second[j][1])))
+
+        for next_i, next_j in ((i + 1, j), (i, j + 1)):
+            if next_i < len(first) and next_j < len(second) and (next_i, next_j) not in seen:
+                seen.add((next_i, next_j))
+                heapq.heappush(heap, (first[next_i][0] + second[next_j][0], next_i, next_j))
+
+    return result
+
+
+def _materialise(path: object) -> list[Mountain]:
+
+    """
+    - Turns a linked path into a list of mountains
+
+    Complexity:
+    - Worst case: O(L) , where L is the number of pieces in the path
+    - Best case: O(1)
+    """
+
+    result : list[Mountain] = []
+    stack : list[object] = [path]
+
+    while len(stack) > 0:
+        piece = stack.pop()
+        while piece is not None:
+            if len(piece) == 2:
+                result.append(piece[0])
+                piece = piece[1]
+            else:
+                stack.append(piece[2])
+                piece = piece[1]
+
+    return result
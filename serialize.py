@@ -1,7 +1,10 @@
-import dataclasses, json
+import dataclasses, io, json, re, struct, sys
+from array import array
 
-from trail import Trail, TrailSplit, TrailSeries
+from trail import Trail
 from mountain import Mountain
+from constants import EMPTY_KIND, SERIES_KIND
+from compiled_trail import CompiledTrail
 
 # https://stackoverflow.com/questions/51286748/make-the-python-json-encoder-support-pythons-new-dataclasses
 class EnhancedJSONEncoder(json.JSONEncoder):
@@ -24,21 +27,300 @@ class EnhancedJSONEncoder(json.JSONEncoder):
                 self.remove_box(o)
 
 def serialize(trail):
-    return json.dumps(trail, cls=EnhancedJSONEncoder)
+    out = io.StringIO()
+    dump(trail, out)
+    return out.getvalue()
 
-def deserialize(obj):
+# Characters buffered by dump before each write to the file.
+DUMP_BUFFER = 1 << 16
+
+def dump(trail, fp):
+    # Streams the same JSON as json.dumps(trail, cls=EnhancedJSONEncoder) to fp, in one pass
+    # over the nodes with an explicit stack. Only the trail fields are written, so box fields
+    # never need stripping, and no copy of the trail is made.
+    # The stack holds nodes still to write and the text that closes or separates them.
+    buffer = []
+    buffered = 0
+    stack = [trail]
+    while len(stack) > 0:
+        item = stack.pop()
+        if isinstance(item, str):
+            chunk = item
+        elif item.store is None:
+            chunk = '{"store": null}'
+        elif item.store.KIND == SERIES_KIND:
+            mountain = item.store.mountain
+            chunk = '{"store": {"mountain": {"name": %s, "difficulty_level": %s, "length": %s}, "following": ' % (
+                json.dumps(mountain.name), json.dumps(mountain.difficulty_level), json.dumps(mountain.length))
+            stack.append("}}")
+            stack.append(item.store.following)
+        else:
+            chunk = '{"store": {"path_top": '
+            stack.append("}}")
+            stack.append(item.store.path_follow)
+            stack.append(', "path_follow": ')
+            stack.append(item.store.path_bottom)
+            stack.append(', "path_bottom": ')
+            stack.append(item.store.path_top)
+
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered >= DUMP_BUFFER:
+            fp.write("".join(buffer))
+            buffer = []
+            buffered = 0
+    fp.write("".join(buffer))
+
+def deserialize(obj, trail_type=Trail):
+    # trail_type picks the node family to build, e.g. draw_trails.TrailBox for the GUI.
     if obj["store"] is None:
-        return Trail(None)
+        return trail_type.TRAIL(None)
     if "mountain" in obj["store"]:
-        inside = TrailSeries(
+        inside = trail_type.SERIES(
             Mountain(**obj["store"]["mountain"]),
-            deserialize(obj["store"]["following"])
+            deserialize(obj["store"]["following"], trail_type)
         )
     else:
-        inside = TrailSplit(
-            deserialize(obj["store"]["path_top"]),
-            deserialize(obj["store"]["path_bottom"]),
-            deserialize(obj["store"]["path_follow"])
+        inside = trail_type.SPLIT(
+            deserialize(obj["store"]["path_top"], trail_type),
+            deserialize(obj["store"]["path_bottom"], trail_type),
+            deserialize(obj["store"]["path_follow"], trail_type)
         )
-    return Trail(inside)
-    
\ No newline at end of file
+    return trail_type.TRAIL(inside)
+    
+# Characters read from the file at a time by load.
+LOAD_CHUNK = 1 << 16
+
+# One JSON token after optional whitespace: punctuation, string, number or literal.
+_TOKEN = re.compile(r'''\s*(?:([{}\[\]:,])|("(?:[^"\\]|\\.)*")|(-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)|(true|false|null))''')
+_LITERALS = {"true": True, "false": False, "null": None}
+
+def _tokens(fp, chunk_size=LOAD_CHUNK):
+    # Yields (is_punctuation, value) for every JSON token of fp, reading chunk_size characters
+    # at a time. A token cut by the end of a chunk is completed from the next chunk.
+    buffer = ""
+    pos = 0
+    eof = False
+    while True:
+        match = _TOKEN.match(buffer, pos)
+        # A number or literal running into the end of the buffer may continue in the next chunk.
+        if not eof and (match is None or (match.end() == len(buffer) and match.lastindex in (3, 4))):
+            chunk = fp.read(chunk_size)
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            eof = len(chunk) == 0
+            continue
+        if match is None:
+            if buffer[pos:].strip() == "":
+                return
+            raise ValueError("Invalid trail JSON near: " + buffer[pos:pos + 20])
+        pos = match.end()
+        punctuation, string, number, literal = match.groups()
+        if punctuation is not None:
+            yield (True, punctuation)
+        elif string is not None:
+            yield (False, json.loads(string))
+        elif number is not None:
+            yield (False, float(number) if any(c in number for c in ".eE") else int(number))
+        else:
+            yield (False, _LITERALS[literal])
+
+def load(fp, trail_type=Trail, chunk_size=LOAD_CHUNK):
+    # Builds a trail straight from the JSON text of fp, as deserialize(json.load(fp), trail_type)
+    # does, without holding the whole dict tree or recursing. Each JSON object is turned into its
+    # node as soon as it closes, using the key it sits under to know what it is.
+    # Open containers are kept on an explicit stack as [container, key in parent, pending key].
+    stack = []
+    result = None
+    done = False
+
+    def place(value):
+        nonlocal result, done
+        if len(stack) == 0:
+            if done:
+                raise ValueError("Unexpected data after the trail")
+            result = value
+            done = True
+        elif isinstance(stack[-1][0], dict):
+            frame = stack[-1]
+            if frame[2] is None:
+                raise ValueError("Value without a key in trail JSON")
+            frame[0][frame[2]] = value
+            frame[2] = None
+        else:
+            stack[-1][0].append(value)
+
+    expecting_key = False
+    for is_punctuation, value in _tokens(fp, chunk_size):
+        if is_punctuation:
+            if value == "{" or value == "[":
+                parent_key = stack[-1][2] if len(stack) > 0 and isinstance(stack[-1][0], dict) else None
+                stack.append([{} if value == "{" else [], parent_key, None])
+                expecting_key = value == "{"
+            elif value == "}" or value == "]":
+                if len(stack) == 0:
+                    raise ValueError("Unbalanced trail JSON")
+                container, parent_key, _ = stack.pop()
+                try:
+                    node = _node(container, parent_key, trail_type)
+                except (KeyError, TypeError) as e:
+                    raise ValueError("Invalid trail JSON object: " + repr(container)) from e
+                place(node)
+                expecting_key = False
+            elif value == ",":
+                expecting_key = len(stack) > 0 and isinstance(stack[-1][0], dict)
+            # ":" needs nothing: the pending key is already recorded.
+        elif expecting_key:
+            stack[-1][2] = value
+            expecting_key = False
+        else:
+            place(value)
+
+    if len(stack) > 0 or not done:
+        raise ValueError("Unexpected end of trail JSON")
+    return result
+
+def _node(obj, key, trail_type):
+    # The node for a closed JSON object, given the key it sits under in its parent.
+    if not isinstance(obj, dict):
+        return obj
+    if key == "mountain":
+        return Mountain(**obj)
+    if key == "store":
+        if "mountain" in obj:
+            return trail_type.SERIES(obj["mountain"], obj["following"])
+        return trail_type.SPLIT(obj["path_top"], obj["path_bottom"], obj["path_follow"])
+    return trail_type.TRAIL(obj["store"])
+
+# Binary trail format: the CompiledTrail arrays written out as little-endian columns.
+#
+#   BINARY_HEADER       magic, format, node count N, mountain count M, root node, string pool size,
+#                       the array typecode of each column
+#   mountain table      difficulties, lengths, name offsets, name lengths        (M values each)
+#   node columns        mountain, next_node, top, bottom, kind                   (N values each)
+#   string pool         utf-8 names, each distinct name stored once
+#
+# Nodes are in post-order (children before parents). Each column is written with the narrowest
+# integer type that holds its values, and wider columns come first, so every column starts
+# aligned to its own width and can be read in place (see lazy_trail.py).
+BINARY_MAGIC = b"TRAILBIN"
+BINARY_FORMAT = 1
+BINARY_HEADER = struct.Struct("<8sIIIII12s")
+BINARY_COLUMNS = ("difficulties", "lengths", "name_offsets", "name_lengths", "mountain", "next_node", "top", "bottom", "kind")
+_SIGNED = "bhiq"
+
+def _narrowest(column):
+    # The narrowest signed typecode holding every value of column.
+    lo = min(column, default = 0)
+    hi = max(column, default = 0)
+    for typecode in _SIGNED:
+        bits = 8 * array(typecode).itemsize
+        if -(1 << (bits - 1)) <= lo and hi < (1 << (bits - 1)):
+            return typecode
+    raise OverflowError("Value too large for a binary trail")
+
+def binary_layout(node_count, mountain_count, typecodes):
+    # Offsets of the columns, by name, as (offset, typecode, count); "pool" is where the strings start.
+    counts = [mountain_count] * 4 + [node_count] * 5
+    columns = sorted(zip(BINARY_COLUMNS, typecodes, counts), key = lambda column: -array(column[1]).itemsize)
+    layout = {}
+    offset = BINARY_HEADER.size
+    for name, typecode, count in columns:
+        layout[name] = (offset, typecode, count)
+        offset += count * array(typecode).itemsize
+    layout["pool"] = (offset, "b", 0)
+    return layout
+
+def _little_endian(column):
+    # array bytes are native; the file is always little-endian.
+    if sys.byteorder == "big":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+def dump_binary(trail, fp):
+    # Writes the trail to the binary file object fp. Sub-trails and mountains shared by
+    # several parents are written once and shared again by load_binary.
+    compiled = CompiledTrail(trail)
+
+    pool = bytearray()
+    pooled = {}
+    name_offsets = array("q")
+    name_lengths = array("q")
+    for name in compiled.names:
+        if name not in pooled:
+            encoded = name.encode("utf-8")
+            pooled[name] = (len(pool), len(encoded))
+            pool += encoded
+        name_offsets.append(pooled[name][0])
+        name_lengths.append(pooled[name][1])
+
+    values = (compiled.difficulties, compiled.lengths, name_offsets, name_lengths,
+              compiled.mountain, compiled.next_node, compiled.top, compiled.bottom, compiled.kind)
+    typecodes = "".join(_narrowest(column) for column in values)
+    layout = binary_layout(len(compiled), len(compiled.mountains), typecodes)
+
+    fp.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_FORMAT, len(compiled), len(compiled.mountains), compiled.root, len(pool), typecodes.encode("ascii")))
+    columns = dict(zip(BINARY_COLUMNS, values))
+    for name in sorted(columns, key = lambda name: layout[name][0]):
+        fp.write(_little_endian(array(layout[name][1], columns[name])))
+    fp.write(bytes(pool))
+
+def read_binary_header(buffer):
+    # (node count, mountain count, root, pool size, layout) of a binary trail; raises ValueError if it is not one.
+    if len(buffer) < BINARY_HEADER.size:
+        raise ValueError("Not a binary trail")
+    magic, binary_format, node_count, mountain_count, root, pool_size, typecodes = BINARY_HEADER.unpack_from(buffer, 0)
+    if magic != BINARY_MAGIC or binary_format != BINARY_FORMAT:
+        raise ValueError("Not a binary trail")
+    typecodes = typecodes.rstrip(b"\x00").decode("ascii", "replace")
+    if len(typecodes) != len(BINARY_COLUMNS) or any(typecode not in _SIGNED for typecode in typecodes):
+        raise ValueError("Not a binary trail")
+    layout = binary_layout(node_count, mountain_count, typecodes)
+    if len(buffer) < layout["pool"][0] + pool_size:
+        raise ValueError("Truncated binary trail")
+    return node_count, mountain_count, root, pool_size, layout
+
+def load_binary(fp, trail_type=Trail):
+    # Reads a trail written by dump_binary, building nodes of the trail_type family.
+    # Nodes are stored children first, so one pass in file order builds every node after its children.
+    data = fp.read()
+    node_count, mountain_count, root, pool_size, layout = read_binary_header(data)
+
+    columns = {}
+    for name, (offset, typecode, count) in layout.items():
+        if name == "pool":
+            continue
+        column = array(typecode)
+        column.frombytes(data[offset:offset + count * column.itemsize])
+        if sys.byteorder == "big":
+            column.byteswap()
+        columns[name] = column
+
+    pool_start = layout["pool"][0]
+    names = {}
+    mountains = []
+    for i in range(mountain_count):
+        start = pool_start + columns["name_offsets"][i]
+        name_key = (start, columns["name_lengths"][i])
+        if name_key not in names:
+            names[name_key] = data[start:start + columns["name_lengths"][i]].decode("utf-8")
+        mountains.append(Mountain(names[name_key], columns["difficulties"][i], columns["lengths"][i]))
+
+    kind, mountain, next_node, top, bottom = columns["kind"], columns["mountain"], columns["next_node"], columns["top"], columns["bottom"]
+    nodes = []
+    for i in range(node_count):
+        if kind[i] == EMPTY_KIND:
+            nodes.append(trail_type.TRAIL(None))
+        elif kind[i] == SERIES_KIND:
+            nodes.append(trail_type.TRAIL(trail_type.SERIES(mountains[mountain[i]], nodes[next_node[i]])))
+        else:
+            nodes.append(trail_type.TRAIL(trail_type.SPLIT(nodes[top[i]], nodes[bottom[i]], nodes[next_node[i]])))
+    return nodes[root]
+
+def json_to_binary(json_path, binary_path):
+    # Converts a JSON trail file (e.g. one of stores/*.json) to the binary format.
+    with open(json_path, "r") as f:
+        trail = load(f)
+    with open(binary_path, "wb") as f:
+        dump_binary(trail, f)
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+
+from mountain import Mountain
+from mountain_manager import MountainManager
+from double_key_table import DoubleKeyTable
+from data_structures.hash_table import LinearProbeTable
+from data_structures.referential_array import ArrayR
+
+"""
+Binary snapshots of a MountainManager.
+
+The snapshot stores the slot layout of the manager's DoubleKeyTable as it is: every outer slot
+(with its size index, table size and count) and every inner slot, so loading it puts each
+mountain straight back into its slot without hashing or probing anything.
+
+Layout (little-endian):
+    HEADER                  magic, format, manager version, secondary_indexes flag,
+                            outer size index, outer table size, outer count,
+                            number of outer and inner table sizes, string pool size
+    TABLE_SIZES             one q per size, for the outer then the inner tables
+    string pool             utf-8 names and keys, each stored once
+    outer slots             OUTER per slot, followed by INNER for each slot of its inner table
+                            when the outer slot is used
+
+Strings are referenced by (offset, length) into the pool.
+"""
+
+MAGIC = b"MMSNAP\x00\x01"
+FORMAT = 1
+
+HEADER = struct.Struct("<8sIqBIIIIII")
+SIZE = struct.Struct("<q")
+# used, difficulty (outer key), inner size index, inner table size, inner count
+OUTER = struct.Struct("<BqIII")
+# used, key offset, key length, name offset, name length, difficulty, length
+INNER = struct.Struct("<BIIIIqq")
+
+
+def snapshot_bytes(manager: MountainManager) -> bytes:
+
+    """
+    - Returns the binary snapshot of the manager
+
+    Args:
+    - manager - of MountainManager class
+
+    Raises:
+    - None
+
+    Returns:
+    - bytes
+
+    Complexity:
+    - Worst case: O(S + L) , where S is the total number of outer and inner slots and L the total length of the names
+    - Best case: O(S + L)
+    """
+
+    table = manager.mountain_table
+
+    pool = bytearray()
+    offsets : dict[str, tuple[int, int]] = {}
+
+    def string(text: str) -> tuple[int, int]:
+        if text not in offsets:
+            encoded = text.encode("utf-8")
+            offsets[text] = (len(pool), len(encoded))
+            pool.extend(encoded)
+        return offsets[text]
+
+    slots = bytearray()
+    for outer in range(table.table_size):
+        item = table.outer_hash_table[outer]
+        if item is None:
+            slots += OUTER.pack(0, 0, 0, 0, 0)
+            continue
+
+        diff, inner_table = item
+        slots += OUTER.pack(1, diff, inner_table.size_index, inner_table.table_size, inner_table.count)
+        for inner in range(inner_table.table_size):
+            entry = inner_table.array[inner]
+            if entry is None:
+                slots += INNER.pack(0, 0, 0, 0, 0, 0, 0)
+            else:
+                key, mountain = entry
+                key_offset, key_length = string(key)
+                name_offset, name_length = string(mountain.name)
+                slots += INNER.pack(1, key_offset, key_length, name_offset, name_length, mountain.difficulty_level, mountain.length)
+
+    header = HEADER.pack(
+        MAGIC, FORMAT, manager.version, manager.secondary_indexes,
+        table.outer_size_index, table.table_size, table.outer_count,
+        len(table.TABLE_SIZES), len(table.INTERNAL_TABLE_SIZES), len(pool),
+        )
+    sizes = b"".join(SIZE.pack(size) for size in list(table.TABLE_SIZES) + list(table.INTERNAL_TABLE_SIZES))
+
+    return header + sizes + bytes(pool) + bytes(slots)
+
+
+def save_snapshot(manager: MountainManager, path: str) -> None:
+
+    """
+    - Writes the binary snapshot of the manager to path
+    - The snapshot is written to a temporary file next to path and then moved over it, so path
+      always holds either the old or the new snapshot, never half of one
+
+    Args:
+    - manager - of MountainManager class
+    - path - str
+
+    Raises:
+    - OSError if the file cannot be written
+
+    Returns:
+    - None
+
+    Complexity:
+    - Worst case: O(S + L) , as snapshot_bytes
+    - Best case: O(S + L)
+    """
+
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(snapshot_bytes(manager))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def load_snapshot(path: str, manager: MountainManager|None = None) -> MountainManager:
+
+    """
+    - Memory-maps a snapshot written by save_snapshot and rebuilds the manager from it
+
+    Args:
+    - path - str
+    - manager - an empty MountainManager (or subclass) to restore into, or None for a new one
+
+    Raises:
+    - ValueError if the file is not a snapshot of this format
+    - OSError if the file cannot be read
+
+    Returns:
+    - MountainManager
+
+    Complexity:
+    - Worst case: O(S + L) , where S is the total number of outer and inner slots and L the total length of the names
+    - Best case: O(S + L)
+    """
+
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ) as buffer:
+            return manager_from_buffer(buffer, manager)
+
+
+def manager_from_buffer(buffer, manager: MountainManager|None = None) -> MountainManager:
+
+    """
+    - Rebuilds a manager from a snapshot held in any buffer (bytes, mmap, memoryview)
+    - Every mountain is put back into the slot it was saved in; the hash functions of the
+      tables are reattached, and the secondary indexes rebuilt when the manager keeps them
+
+    Args:
+    - buffer - the snapshot
+    - manager - an empty MountainManager (or subclass) to restore into, or None for a new one
+      with the secondary indexes the saved manager had
+
+    Raises:
+    - ValueError if the buffer is not a snapshot of this format
+
+    Returns:
+    - MountainManager
+
+    Complexity:
+    - Worst case: O(S + L) , plus O(Nlog(N)) for the secondary indexes, where N is the number of mountains
+    - Best case: O(S + L)
+    """
+
+    if len(buffer) < HEADER.size:
+        raise ValueError("Not a mountain manager snapshot")
+    (magic, snapshot_format, version, secondary_indexes, outer_size_index, outer_table_size, outer_count,
+     sizes_count, internal_sizes_count, pool_size) = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC or snapshot_format != FORMAT:
+        raise ValueError("Not a mountain manager snapshot")
+
+    offset = HEADER.size
+    sizes = [SIZE.unpack_from(buffer, offset + i * SIZE.size)[0] for i in range(sizes_count + internal_sizes_count)]
+    offset += len(sizes) * SIZE.size
+
+    pool = bytes(buffer[offset:offset + pool_size])
+    offset += pool_size
+    strings : dict[tuple[int, int], str] = {}
+
+    def string(string_offset: int, string_length: int) -> str:
+        # Names shared by a key and its mountain are decoded once.
+        text = strings.get((string_offset, string_length))
+        if text is None:
+            text = pool[string_offset:string_offset + string_length].decode("utf-8")
+            strings[(string_offset, string_length)] = text
+        return text
+
+    if manager is None:
+        manager = MountainManager(secondary_indexes = bool(secondary_indexes))
+    table : DoubleKeyTable[int, str, Mountain] = manager.mountain_table
+    table.TABLE_SIZES = sizes[:sizes_count]
+    table.INTERNAL_TABLE_SIZES = sizes[sizes_count:]
+    table.outer_size_index = outer_size_index
+    table.outer_hash_table = ArrayR(outer_table_size)
+    table.outer_count = outer_count
+
+    for outer in range(outer_table_size):
+        used, diff, size_index, inner_size, count = OUTER.unpack_from(buffer, offset)
+        offset += OUTER.size
+        if not used:
+            continue
+
+        inner_table : LinearProbeTable[str, Mountain] = LinearProbeTable(sizes = table.INTERNAL_TABLE_SIZES)
+        inner_table.size_index = size_index
+        inner_table.array = ArrayR(inner_size)
+        inner_table.count = count
+        _attach_hash(table, inner_table)
+
+        for inner in range(inner_size):
+            used, key_offset, key_length, name_offset, name_length, difficulty_level, length = INNER.unpack_from(buffer, offset)
+            offset += INNER.size
+            if used:
+                mountain = Mountain(string(name_offset, name_length), difficulty_level, length)
+                inner_table.array[inner] = (string(key_offset, key_length), mountain)
+                if manager.secondary_indexes:
+                    manager._index(mountain)
+
+        table.outer_hash_table[outer] = (diff, inner_table)
+
+    manager.version = version
+    return manager
+
+
+def _attach_hash(table: DoubleKeyTable, inner_table: LinearProbeTable) -> None:
+
+    """
+    - Gives an inner table the hash DoubleKeyTable gives its inner tables (hash2 on that table)
+
+    Complexity:
+    - Worst case: O(1)
+    - Best case: O(1)
+    """
+
+    inner_table.hash = lambda k: table.hash2(k, inner_table)
@@ -0,0 +1,91 @@
+import random
+import unittest
+from ed_utils.decorators import number
+
+from algorithms.mergesort import mergesort, mergesort_keyed, merge
+from algorithms.binary_search import binary_search, binary_search_keys
+
+class TestAlgorithms(unittest.TestCase):
+
+    @number("13.1")
+    def test_keys_computed_once(self):
+        rng = random.Random(1008)
+        items = [rng.randint(0, 100) for _ in range(257)]
+        calls = []
+        def key(x):
+            calls.append(x)
+            return -x
+
+        res, keys = mergesort_keyed(items, key=key)
+        self.assertListEqual(res, sorted(items, reverse=True))
+        self.assertListEqual(keys, [-x for x in res])
+        self.assertEqual(len(calls), len(items))
+
+        calls.clear()
+        self.assertListEqual(mergesort(items, key=key), res)
+        self.assertEqual(len(calls), len(items))
+
+        calls.clear()
+        self.assertListEqual(merge(res[:100], res[100:], key=key), sorted(res, reverse=True))
+        self.assertLessEqual(len(calls), len(res))
+
+    @number("13.2")
+    def test_binary_search_keys(self):
+        l = list(range(0, 100, 3))
+        for item in range(-1, 101):
+            if item % 3 == 0 and 0 <= item < 100:
+                self.assertEqual(binary_search_keys(l, item), item // 3)
+                self.assertEqual(binary_search(l, item), item // 3)
+            else:
+                self.assertRaises(KeyError, lambda: binary_search_keys(l, item))
+                self.assertEqual(binary_search_keys(l, item, is_insert=True), binary_search(l, item, is_insert=True))
+
+    @number("13.3")
+    def test_natural_mergesort(self):
+        from algorithms.mergesort import natural_mergesort, natural_mergesort_keyed
+
+        rng = random.Random(1038)
+        cases = [[], [1], list(range(50)), list(range(50, 0, -1)), [3, 3, 2, 2, 1, 1]]
+        cases += [[rng.randint(0, 20) for _ in range(rng.randint(0, 200))] for _ in range(50)]
+        cases += [sorted(rng.randint(0, 1000) for _ in range(300))[:150] + [rng.randint(0, 1000) for _ in range(5)]]
+        for case in cases:
+            pairs = [(x, i) for i, x in enumerate(case)]
+            # Stability: equal keys keep their original order.
+            self.assertListEqual(natural_mergesort(pairs, key=lambda p: p[0]), sorted(pairs, key=lambda p: p[0]))
+            items, keys = natural_mergesort_keyed(case)
+            self.assertListEqual(items, sorted(case))
+            self.assertListEqual(keys, sorted(case))
+
+    @number("13.4")
+    def test_merge_k_and_external_sort(self):
+        from algorithms.external_sort import merge_k, external_mergesort
+
+        rng = random.Random(1039)
+        lists = [sorted(rng.randint(0, 30) for _ in range(rng.randint(0, 40))) for _ in range(7)]
+        tagged = [[(x, i) for x in l] for i, l in enumerate(lists)]
+        self.assertListEqual(list(merge_k(tagged, key=lambda p: p[0])), sorted(sum(tagged, []), key=lambda p: p[0]))
+        self.assertListEqual(list(merge_k([])), [])
+
+        items = [[rng.randint(0, 100), i] for i in range(1000)]
+        for run_size, fan_in in [(10000, 64), (37, 64), (10, 3)]:
+            res = list(external_mergesort(iter(items), key=lambda p: p[0], run_size=run_size, fan_in=fan_in))
+            self.assertListEqual(res, sorted(items, key=lambda p: p[0]))
+
+    @number("13.5")
+    def test_bisect_and_search_many(self):
+        import bisect
+        from algorithms.binary_search import bisect_left, bisect_right, find, search_many
+
+        l = [0, 2, 2, 2, 5, 7, 7, 9]
+        for item in range(-1, 11):
+            self.assertEqual(bisect_left(l, item), bisect.bisect_left(l, item))
+            self.assertEqual(bisect_right(l, item), bisect.bisect_right(l, item))
+            self.assertEqual(find(l, item), l.index(item) if item in l else None)
+
+        rng = random.Random(1040)
+        for n, q in [(0, 5), (1000, 3), (1000, 800), (50, 50)]:
+            keys = sorted(rng.randint(0, 2 * n + 1) for _ in range(n))
+            queries = sorted(rng.randint(-1, 2 * n + 2) for _ in range(q))
+            expected = [keys.index(x) if x in keys else None for x in queries]
+            self.assertListEqual(search_many(keys, queries), expected)
+            self.assertListEqual(search_many(iter(keys), queries, length = n, find_key = lambda x : find(keys, x)), expected)
@@ -0,0 +1,62 @@
+import unittest
+from ed_utils.decorators import number
+
+from mountain import Mountain
+from trail import Trail, TrailSeries, TrailSplit
+from personality import WalkerPersonality, TopWalker, BottomWalker, LazyWalker
+
+class TestCompiledTrail(unittest.TestCase):
+
+    def load_example(self):
+        self.top_top = Mountain("top-top", 5, 3)
+        self.top_bot = Mountain("top-bot", 3, 5)
+        self.top_mid = Mountain("top-mid", 4, 7)
+        self.bot_one = Mountain("bot-one", 2, 5)
+        self.bot_two = Mountain("bot-two", 0, 0)
+        self.final   = Mountain("final", 4, 4)
+        self.trail = Trail(TrailSplit(
+            Trail(TrailSplit(
+                Trail(TrailSeries(self.top_top, Trail(None))),
+                Trail(TrailSeries(self.top_bot, Trail(None))),
+                Trail(TrailSeries(self.top_mid, Trail(None))),
+            )),
+            Trail(TrailSeries(self.bot_one, Trail(TrailSplit(
+                Trail(TrailSeries(self.bot_two, Trail(None))),
+                Trail(None),
+                Trail(None),
+            )))),
+            Trail(TrailSeries(self.final, Trail(None)))
+        ))
+
+    @number("9.1")
+    def test_follow_path(self):
+        self.load_example()
+        compiled = self.trail.compile()
+        for walker_type in [TopWalker, BottomWalker, LazyWalker]:
+            expected = walker_type()
+            actual = walker_type()
+            self.trail.follow_path(expected)
+            compiled.follow_path(actual)
+            self.assertListEqual(actual.mountains, expected.mountains)
+
+    @number("9.2")
+    def test_enumeration(self):
+        self.load_example()
+        compiled = self.trail.compile()
+
+        self.assertListEqual(compiled.collect_all_mountains(), self.trail.collect_all_mountains())
+        self.assertListEqual(compiled.collect_mountain_list(), self.trail.collect_mountain_list())
+        self.assertListEqual(compiled.length_k_paths(3), self.trail.length_k_paths(3))
+        self.assertEqual(compiled.count_paths(), len(self.trail.collect_mountain_list()))
+        self.assertEqual(compiled.names[compiled.mountain[compiled.root - 1]], "final")
+
+    @number("9.3")
+    def test_long_series(self):
+        trail = Trail(None)
+        for i in range(5000):
+            trail = trail.add_mountain_before(Mountain(str(i), i, i))
+        compiled = trail.compile()
+
+        self.assertEqual(len(compiled), 5001)
+        self.assertEqual(len(compiled.collect_all_mountains()), 5000)
+        self.assertEqual(compiled.count_paths(), 1)
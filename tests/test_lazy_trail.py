@@ -0,0 +1,71 @@
+import os
+import random
+import tempfile
+import unittest
+from ed_utils.decorators import number
+
+from mountain import Mountain
+from trail import Trail, TrailSplit
+from personality import TopWalker, BottomWalker, LazyWalker
+from serialize import dump_binary, serialize
+from lazy_trail import LazyTrail, open_trail
+
+class TestLazyTrail(unittest.TestCase):
+
+    def random_trail(self, rng, depth):
+        trail = Trail(None)
+        for _ in range(rng.randint(0, 3)):
+            if depth > 0 and rng.random() < 0.4:
+                trail = Trail(TrailSplit(self.random_trail(rng, depth - 1), self.random_trail(rng, depth - 1), trail))
+            else:
+                trail = trail.add_mountain_before(Mountain(f"m{rng.randint(0, 9)}", rng.randint(0, 9), rng.randint(0, 9)))
+        return trail
+
+    def write(self, directory, trail):
+        path = os.path.join(directory, "trail.bin")
+        with open(path, "wb") as f:
+            dump_binary(trail, f)
+        return path
+
+    @number("18.1")
+    def test_matches_trail(self):
+        rng = random.Random(1050)
+        with tempfile.TemporaryDirectory() as directory:
+            for _ in range(20):
+                trail = self.random_trail(rng, 4)
+                with open_trail(self.write(directory, trail)) as view:
+                    lazy = view.root
+                    self.assertIsInstance(lazy, LazyTrail)
+                    for walker_type in [TopWalker, BottomWalker, LazyWalker]:
+                        expected, actual = walker_type(), walker_type()
+                        trail.follow_path(expected)
+                        lazy.follow_path(actual)
+                        self.assertListEqual(actual.mountains, expected.mountains)
+                    self.assertListEqual(lazy.collect_all_mountains(), trail.collect_all_mountains())
+                    self.assertListEqual(lazy.length_k_paths(2), trail.length_k_paths(2))
+                    self.assertEqual(serialize(lazy), serialize(trail))
+
+    @number("18.2")
+    def test_only_walked_nodes_materialised(self):
+        trail = Trail(None)
+        for i in range(2000):
+            trail = Trail(TrailSplit(Trail(None).add_mountain_before(Mountain(f"top{i}", 1, i)),
+                                     Trail(None).add_mountain_before(Mountain(f"bot{i}", 2, i)),
+                                     trail))
+        with tempfile.TemporaryDirectory() as directory:
+            view = open_trail(self.write(directory, trail))
+            walker = TopWalker()
+            view.root.follow_path(walker)
+            self.assertEqual(len(walker.mountains), 2000)
+            self.assertEqual(len(view._mountains), 2000)
+            self.assertLess(len(view._nodes), view.node_count)
+
+            # Materialised nodes outlive the mapping and can be edited.
+            edited = view.root.add_mountain_before(Mountain("new", 0, 0))
+            view.close()
+            self.assertEqual(edited.store.mountain.name, "new")
+            self.assertRaises(ValueError, lambda: view.root.store.path_bottom.store)
+
+            empty = os.path.join(directory, "empty.bin")
+            open(empty, "wb").close()
+            self.assertRaises(ValueError, lambda: open_trail(empty))
@@ -0,0 +1,70 @@
+import os
+import random
+import tempfile
+import unittest
+from ed_utils.decorators import number
+
+from mountain import Mountain
+from mountain_manager import MountainManager
+from mountain_journal import DurableMountainManager
+
+class TestMountainJournal(unittest.TestCase):
+
+    def apply_random(self, managers, rng, steps):
+        for _ in range(steps):
+            mountain = Mountain(f"m{rng.randint(0, 40)}", rng.randint(0, 8), rng.randint(0, 30))
+            roll = rng.random()
+            for manager in managers:
+                if roll < 0.6:
+                    manager.add_mountain(Mountain(mountain.name, mountain.difficulty_level, mountain.length))
+                elif roll < 0.8:
+                    manager.remove_mountain(mountain)
+                else:
+                    manager.edit_mountain(mountain, Mountain(mountain.name, (mountain.difficulty_level + 1) % 9, mountain.length + 1))
+
+    def state(self, manager):
+        return sorted((m.difficulty_level, m.name, m.length) for group in manager.group_by_difficulty() for m in group)
+
+    @number("16.1")
+    def test_replay_and_compaction(self):
+        rng = random.Random(1046)
+        with tempfile.TemporaryDirectory() as directory:
+            plain = MountainManager()
+            durable = DurableMountainManager(directory, sync_every=8, compact_every=150)
+            self.apply_random([plain, durable], rng, 400)
+            self.assertTrue(os.path.exists(os.path.join(directory, "mountains.snap")))
+            durable.close()
+
+            restored = DurableMountainManager(directory, secondary_indexes=True)
+            self.assertEqual(self.state(restored), self.state(plain))
+            self.assertEqual(restored.version, durable.version)
+            self.apply_random([plain, restored], rng, 50)
+            restored.compact()
+            self.apply_random([plain, restored], rng, 50)
+            restored.close()
+
+            again = DurableMountainManager(directory)
+            self.assertEqual(self.state(again), self.state(plain))
+            again.close()
+
+    @number("16.2")
+    def test_torn_tail(self):
+        with tempfile.TemporaryDirectory() as directory:
+            durable = DurableMountainManager(directory)
+            durable.add_mountain(Mountain("m1", 1, 5))
+            durable.add_mountain(Mountain("m2", 2, 6))
+            durable.close()
+
+            log_path = os.path.join(directory, "mountains.log")
+            size = os.path.getsize(log_path)
+            with open(log_path, "r+b") as f:
+                f.truncate(size - 3)
+
+            restored = DurableMountainManager(directory)
+            self.assertEqual(self.state(restored), [(1, "m1", 5)])
+            restored.add_mountain(Mountain("m3", 3, 7))
+            restored.close()
+
+            again = DurableMountainManager(directory)
+            self.assertEqual(self.state(again), [(1, "m1", 5), (3, "m3", 7)])
+            again.close()
@@ -105,3 +105,124 @@ class TestInfiniteHash(unittest.TestCase):
 
         self.assertEqual(make_set(res[3]), make_set([m10])) 
 
+
+    @number("5.2")
+    def test_cached_views(self):
+        import random
+        rng = random.Random(1042)
+        mm = MountainManager()
+        mountains = [Mountain(f"m{i}", rng.randint(0, 12), rng.randint(0, 20)) for i in range(120)]
+
+        for step in range(400):
+            mountain = rng.choice(mountains)
+            version = mm.version
+            if rng.random() < 0.6:
+                mm.add_mountain(mountain)
+                self.assertEqual(mm.version, version + 1)
+            else:
+                mm.remove_mountain(mountain)
+
+            diff = rng.randint(0, 12)
+            view = mm.mountains_with_difficulty(diff)
+            self.assertListEqual(view, mm.mountain_table.values(diff))
+            view.append(None)
+            self.assertNotIn(None, mm.mountains_with_difficulty(diff))
+            if step % 10 == 0:
+                expected = [mm.mountain_table.values(key) for key in mm.mountain_table.keys()]
+                self.assertListEqual(mm.group_by_difficulty(), expected)
+
+    @number("5.3")
+    def test_secondary_indexes(self):
+        import random
+        rng = random.Random(1043)
+        indexed = MountainManager(secondary_indexes=True)
+        plain = MountainManager()
+        names = [f"m{i}" for i in range(25)]
+
+        for step in range(500):
+            mountain = Mountain(rng.choice(names), rng.randint(0, 6), rng.randint(0, 30))
+            if rng.random() < 0.6:
+                indexed.add_mountain(mountain)
+                plain.add_mountain(copy(mountain))
+            else:
+                indexed.remove_mountain(mountain)
+                plain.remove_mountain(mountain)
+
+            name = rng.choice(names)
+            key = lambda m: (m.difficulty_level, m.name, m.length)
+            self.assertListEqual(sorted(map(key, indexed.find_by_name(name))), sorted(map(key, plain.find_by_name(name))))
+            lo = rng.randint(0, 30)
+            hi = lo + rng.randint(0, 10)
+            self.assertListEqual(list(map(key, indexed.mountains_in_length_range(lo, hi))),
+                                 list(map(key, plain.mountains_in_length_range(lo, hi))))
+
+        # Editing a stored mountain in place, then telling the manager (as the GUI does).
+        stored = indexed.group_by_difficulty()[0][0]
+        old = copy(stored)
+        stored.length = 1000
+        indexed.edit_mountain(old, stored)
+        self.assertListEqual(indexed.mountains_in_length_range(1000, 1000), [stored])
+        self.assertEqual(len(indexed.length_index), sum(len(group) for group in indexed.group_by_difficulty()))
+
+    @number("5.4")
+    def test_edit_in_place(self):
+        for indexes in (False, True):
+            mm = MountainManager(secondary_indexes=indexes)
+            mountains = [Mountain(f"m{i}", i % 3, i) for i in range(12)]
+            for mountain in mountains:
+                mm.add_mountain(mountain)
+            slots = mm.mountain_table.outer_hash_table[1][1].array
+
+            # Length-only edits stay in the same inner table and slots.
+            edited = [Mountain(m.name, m.difficulty_level, m.length + 100) for m in mountains]
+            mm.edit_many(list(zip(mountains, edited)))
+            self.assertIs(mm.mountain_table.outer_hash_table[1][1].array, slots)
+            self.assertListEqual(sorted(m.length for m in mm.mountains_with_difficulty(1)), [101, 104, 107, 110])
+            self.assertTrue(all(mm.mountain_table[m.difficulty_level, m.name] is m for m in edited))
+
+            # A difficulty change moves the mountain.
+            moved = Mountain("m4", 2, 4)
+            mm.edit_mountain(edited[4], moved)
+            self.assertNotIn((1, "m4"), mm.mountain_table)
+            self.assertIs(mm.mountain_table[2, "m4"], moved)
+            self.assertEqual(sum(len(group) for group in mm.group_by_difficulty()), 12)
+            if indexes:
+                self.assertListEqual(mm.find_by_name("m4"), [moved])
+                self.assertListEqual(mm.mountains_in_length_range(0, 99), [moved])
+                self.assertEqual(len(mm.length_index), 12)
+
+    @number("5.5")
+    def test_absent_difficulties_not_cached(self):
+        mm = MountainManager()
+        mm.add_mountain(Mountain("m1", 1, 1))
+        for diff in range(2, 2000):
+            self.assertListEqual(mm.mountains_with_difficulty(diff), [])
+        self.assertEqual(len(mm.mountains_with_difficulty(1)), 1)
+        self.assertLessEqual(len(mm._views), 1)
+
+    @number("5.6")
+    def test_colliding_difficulties(self):
+        from rank_history import RankHistory
+        mm = MountainManager()
+        a = Mountain("a", 1, 1)
+        b = Mountain("b", 6, 1)
+        # 1 and 6 share a slot in the size 5 outer table, so removing a moves b back.
+        mm.add_mountain(a)
+        mm.add_mountain(b)
+        history = RankHistory(mm)
+        self.assertListEqual(mm.group_by_difficulty(), [[a], [b]])
+        mm.remove_mountain(a)
+        self.assertListEqual(mm.group_by_difficulty(), [[b]])
+        self.assertListEqual(history.histories(), [(b, 0, [0])])
+
+        import random
+        rng = random.Random(1056)
+        mountains = [Mountain(f"m{i}", rng.choice([0, 5, 10, 13, 26, 29, 58]), rng.randint(0, 20)) for i in range(60)]
+        for step in range(600):
+            mountain = rng.choice(mountains)
+            if rng.random() < 0.5:
+                mm.add_mountain(mountain)
+            else:
+                mm.remove_mountain(mountain)
+            expected = [mm.mountain_table.values(key) for key in mm.mountain_table.keys()]
+            self.assertListEqual(mm.group_by_difficulty(), expected)
@@ -83,3 +83,59 @@ class TestInfiniteHash(unittest.TestCase):
         # print("list is " , mo.sorted_mountain_list)
         
         self.assertRaises(KeyError, lambda: mo.cur_position(m10)) 
+
+
+    @number("6.2")
+    def test_removals_and_ranges(self):
+        m1 = Mountain("m1", 2, 2)
+        m2 = Mountain("m2", 2, 9)
+        m3 = Mountain("m3", 3, 6)
+        m4 = Mountain("m4", 3, 1)
+        m5 = Mountain("m5", 4, 6)
+
+        mo = MountainOrganiser()
+        mo.add_mountains([m1, m2, m3, m4, m5])
+        self.assertListEqual([mo.mountain_at(i) for i in range(len(mo))], [m4, m1, m3, m5, m2])
+        self.assertListEqual(mo.mountains_in_length_range(2, 6), [m1, m3, m5])
+
+        mo.remove_mountain(m3)
+        self.assertEqual(len(mo), 4)
+        self.assertListEqual([mo.cur_position(m) for m in [m1, m2, m4, m5]], [1, 3, 0, 2])
+        self.assertRaises(KeyError, lambda: mo.cur_position(m3))
+        self.assertRaises(KeyError, lambda: mo.remove_mountain(m3))
+        self.assertListEqual(mo.mountains_in_length_range(7, 100), [m2])
+
+
+    @number("6.3")
+    def test_external_batches(self):
+        import random
+        rng = random.Random(1039)
+        mountains = [Mountain(f"m{i}", rng.randint(0, 9), rng.randint(0, 50)) for i in range(300)]
+
+        mo = MountainOrganiser()
+        mo.add_mountains(mountains[:100])
+        mo.add_mountains_external(iter(mountains[100:]), run_size=16)
+
+        expected = sorted(mountains, key=lambda m: (m.length, m.name))
+        self.assertListEqual(mo.sorted_mountain_list, expected)
+        self.assertListEqual(mo.sorted_keys, [(m.length, m.name) for m in expected])
+        self.assertEqual(mo.cur_position(mountains[250]), expected.index(mountains[250]))
+        self.assertListEqual(mo.positions(mountains[::-7]), [mo.cur_position(m) for m in mountains[::-7]])
+        self.assertListEqual(mo.positions(mountains[:3]), [mo.cur_position(m) for m in mountains[:3]])
+        self.assertRaises(KeyError, lambda: mo.positions([Mountain("missing", 1, 1)]))
+        self.assertRaises(KeyError, lambda: mo.positions(mountains[::2] + [Mountain("missing", 1, 1)]))
+
+        # A single run is sorted in memory and keeps the original objects, spilled runs give copies.
+        mo = MountainOrganiser()
+        mo.add_mountains_external(iter(mountains[:10]), run_size=16)
+        self.assertTrue(all(any(m is original for original in mountains[:10]) for m in mo.sorted_mountain_list))
+        mo.add_mountains_external(iter(mountains[10:50]), run_size=16)
+        self.assertFalse(any(m is original for m in mo.sorted_mountain_list for original in mountains[10:50]))
+        self.assertListEqual(mo.sorted_mountain_list, sorted(mountains[:50], key=lambda m: (m.length, m.name)))
+
+        # A stream failing part way keeps every mountain added before it.
+        def failing():
+            yield from sorted(mountains[50:60], key=lambda m: (m.length, m.name))
+            raise OSError("disk gone")
+        self.assertRaises(OSError, lambda: mo.add_sorted_stream(failing()))
+        self.assertListEqual(mo.sorted_mountain_list, sorted(mountains[:60], key=lambda m: (m.length, m.name)))
@@ -0,0 +1,44 @@
+import unittest
+from ed_utils.decorators import number
+
+from mountain import Mountain
+from trail import Trail, TrailSeries, TrailSplit
+from parallel_paths import collect_mountain_list_parallel, length_k_paths_parallel, decision_prefixes
+
+class TestParallelPaths(unittest.TestCase):
+
+    def load_example(self):
+        self.top_top = Mountain("top-top", 5, 3)
+        self.top_bot = Mountain("top-bot", 3, 5)
+        self.top_mid = Mountain("top-mid", 4, 7)
+        self.bot_one = Mountain("bot-one", 2, 5)
+        self.bot_two = Mountain("bot-two", 0, 0)
+        self.final   = Mountain("final", 4, 4)
+        self.trail = Trail(TrailSplit(
+            Trail(TrailSplit(
+                Trail(TrailSeries(self.top_top, Trail(None))),
+                Trail(TrailSeries(self.top_bot, Trail(None))),
+                Trail(TrailSeries(self.top_mid, Trail(None))),
+            )),
+            Trail(TrailSeries(self.bot_one, Trail(TrailSplit(
+                Trail(TrailSeries(self.bot_two, Trail(None))),
+                Trail(None),
+                Trail(None),
+            )))),
+            Trail(TrailSeries(self.final, Trail(None)))
+        ))
+
+    @number("10.1")
+    def test_prefixes_partition_paths(self):
+        self.load_example()
+        compiled = self.trail.compile()
+        for depth in range(4):
+            prefixes = decision_prefixes(compiled, depth)
+            paths = [path for prefix in prefixes for path in compiled.iter_paths(prefix = prefix)]
+            self.assertListEqual(paths, list(compiled.iter_paths()))
+
+    @number("10.2")
+    def test_parallel_matches_serial(self):
+        self.load_example()
+        self.assertListEqual(collect_mountain_list_parallel(self.trail, max_workers = 2), self.trail.collect_mountain_list())
+        self.assertListEqual(length_k_paths_parallel(self.trail, 3, max_workers = 2), self.trail.length_k_paths(3))
@@ -0,0 +1,51 @@
+import random
+import unittest
+from ed_utils.decorators import number
+
+from mountain import Mountain
+from mountain_manager import MountainManager
+from mountain_organiser import MountainOrganiser
+from rank_history import RankHistory
+
+class TestRankHistory(unittest.TestCase):
+
+    def expected(self, manager):
+        # The original graph computation: re-rank everything after each group.
+        organiser = MountainOrganiser()
+        seen = []
+        ranks = {}
+        for group in manager.group_by_difficulty():
+            organiser.add_mountains(group)
+            seen.extend(group)
+            for mountain in seen:
+                ranks.setdefault(id(mountain), []).append(organiser.cur_position(mountain))
+        return [ranks[id(mountain)] for mountain in seen]
+
+    @number("14.1")
+    def test_matches_organiser(self):
+        rng = random.Random(1041)
+        manager = MountainManager()
+        for i in range(200):
+            manager.add_mountain(Mountain(f"m{rng.randint(0, 60)}", rng.randint(0, 9), rng.randint(0, 30)))
+
+        history = RankHistory(manager)
+        histories = history.histories()
+        self.assertListEqual([ranks for _, _, ranks in histories], self.expected(manager))
+        groups = manager.group_by_difficulty()
+        self.assertListEqual([group_index for _, group_index, _ in histories],
+                             [i for i, group in enumerate(groups) for _ in group])
+
+    @number("14.2")
+    def test_cache_invalidation(self):
+        manager = MountainManager()
+        m1 = Mountain("m1", 2, 5)
+        m2 = Mountain("m2", 3, 1)
+        manager.add_mountain(m1)
+        history = RankHistory(manager)
+        first = history.histories()
+        self.assertIs(history.histories(), first)
+
+        manager.add_mountain(m2)
+        self.assertListEqual([ranks for _, _, ranks in history.histories()], [[0, 1], [0]])
+        manager.remove_mountain(m1)
+        self.assertListEqual([ranks for _, _, ranks in history.histories()], [[0]])
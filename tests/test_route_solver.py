@@ -0,0 +1,73 @@
+import random
+import unittest
+from ed_utils.decorators import number
+
+from mountain import Mountain
+from trail import Trail, TrailSeries, TrailSplit
+from route_solver import best_path, top_k_paths
+
+class TestRouteSolver(unittest.TestCase):
+
+    def load_example(self):
+        self.top_top = Mountain("top-top", 5, 3)
+        self.top_bot = Mountain("top-bot", 3, 5)
+        self.top_mid = Mountain("top-mid", 4, 7)
+        self.bot_one = Mountain("bot-one", 2, 5)
+        self.bot_two = Mountain("bot-two", 0, 0)
+        self.final   = Mountain("final", 4, 4)
+        self.trail = Trail(TrailSplit(
+            Trail(TrailSplit(
+                Trail(TrailSeries(self.top_top, Trail(None))),
+                Trail(TrailSeries(self.top_bot, Trail(None))),
+                Trail(TrailSeries(self.top_mid, Trail(None))),
+            )),
+            Trail(TrailSeries(self.bot_one, Trail(TrailSplit(
+                Trail(TrailSeries(self.bot_two, Trail(None))),
+                Trail(None),
+                Trail(None),
+            )))),
+            Trail(TrailSeries(self.final, Trail(None)))
+        ))
+
+    def random_trail(self, rng, depth):
+        trail = Trail(None)
+        for _ in range(rng.randint(0, 3)):
+            if depth > 0 and rng.random() < 0.4:
+                trail = Trail(TrailSplit(self.random_trail(rng, depth - 1), self.random_trail(rng, depth - 1), trail))
+            else:
+                trail = trail.add_mountain_before(Mountain("m", rng.randint(0, 9), rng.randint(0, 9)))
+        return trail
+
+    @number("11.1")
+    def test_example(self):
+        self.load_example()
+        self.assertEqual(best_path(self.trail), (6, [self.bot_one, self.bot_two, self.final]))
+        self.assertEqual(best_path(self.trail, maximise=True), (13, [self.top_top, self.top_mid, self.final]))
+        self.assertEqual(best_path(self.trail, score=lambda m: m.length, maximise=True), (16, [self.top_bot, self.top_mid, self.final]))
+
+        # With a memo the objective is the memo's; a different one is refused.
+        from branch_stats import BranchMemo
+        length = lambda m: m.length
+        memo = BranchMemo(score=length, maximise=True)
+        self.assertEqual(best_path(self.trail, memo=memo), (16, [self.top_bot, self.top_mid, self.final]))
+        self.assertEqual(best_path(self.trail, score=length, maximise=True, memo=memo)[0], 16)
+        self.assertRaises(ValueError, lambda: best_path(self.trail, maximise=False, memo=memo))
+        self.assertRaises(ValueError, lambda: best_path(self.trail, score=lambda m: m.difficulty_level, memo=memo))
+
+        res = top_k_paths(self.trail, 3)
+        self.assertListEqual([value for value, path in res], [6, 6, 11])
+        self.assertListEqual(res[0][1], [self.bot_one, self.bot_two, self.final])
+        self.assertListEqual(res[1][1], [self.bot_one, self.final])
+
+    @number("11.2")
+    def test_matches_enumeration(self):
+        rng = random.Random(1008)
+        for _ in range(50):
+            trail = self.random_trail(rng, 3)
+            scores = sorted(sum(m.difficulty_level for m in path) for path in trail.collect_mountain_list())
+            self.assertEqual(best_path(trail)[0], scores[0])
+            self.assertEqual(best_path(trail, maximise=True)[0], scores[-1])
+            res = top_k_paths(trail, 5)
+            self.assertListEqual([value for value, path in res], scores[:5])
+            for value, path in res:
+                self.assertEqual(sum(m.difficulty_level for m in path), value)
@@ -0,0 +1,126 @@
+import io
+import json
+import random
+import unittest
+from ed_utils.decorators import number
+
+from mountain import Mountain
+from trail import Trail, TrailSplit
+from serialize import serialize, deserialize, dump, EnhancedJSONEncoder
+from draw_trails import TrailBox, Box
+from personality import TopWalker
+
+class TestSerialize(unittest.TestCase):
+
+    def random_trail(self, rng, depth):
+        trail = Trail(None)
+        for _ in range(rng.randint(0, 3)):
+            if depth > 0 and rng.random() < 0.4:
+                trail = Trail(TrailSplit(self.random_trail(rng, depth - 1), self.random_trail(rng, depth - 1), trail))
+            else:
+                trail = trail.add_mountain_before(Mountain(rng.choice(["m", "é\"x", "a\\b"]), rng.randint(0, 9), rng.randint(0, 9)))
+        return trail
+
+    @number("17.1")
+    def test_dump_matches_encoder(self):
+        rng = random.Random(1047)
+        for _ in range(30):
+            trail = self.random_trail(rng, 4)
+            expected = json.dumps(trail, cls=EnhancedJSONEncoder)
+            self.assertEqual(serialize(trail), expected)
+
+            # Box fields are skipped.
+            boxed = deserialize(json.loads(expected), TrailBox)
+            boxed.trail_box = Box(1, 2, 3, 4)
+            out = io.StringIO()
+            dump(boxed, out)
+            self.assertEqual(out.getvalue(), expected)
+
+        with open("stores/basic.json") as f:
+            trail = deserialize(json.load(f))
+        self.assertEqual(serialize(trail), json.dumps(trail, cls=EnhancedJSONEncoder))
+
+    @number("17.2")
+    def test_dump_long_series(self):
+        trail = Trail(None)
+        for i in range(20000):
+            trail = trail.add_mountain_before(Mountain(f"m{i}", 1, i))
+        text = serialize(trail)
+        self.assertTrue(text.startswith('{"store": {"mountain": {"name": "m19999", "difficulty_level": 1, "length": 19999}'))
+        self.assertTrue(text.endswith('{"store": null}' + "}}" * 20000))
+
+    @number("17.3")
+    def test_load_matches_deserialize(self):
+        from serialize import load
+
+        rng = random.Random(1048)
+        texts = [serialize(self.random_trail(rng, 4)) for _ in range(30)]
+        with open("stores/basic.json") as f:
+            texts.append(f.read())
+        texts.append(' \n{ "store" :\n null }  ')
+        for text in texts:
+            expected = deserialize(json.loads(text))
+            for chunk_size in (1, 7, 1 << 16):
+                trail = load(io.StringIO(text), chunk_size=chunk_size)
+                self.assertEqual(serialize(trail), serialize(expected))
+
+        boxed = load(io.StringIO(texts[-2]), TrailBox)
+        self.assertIsInstance(boxed, TrailBox)
+        self.assertIsInstance(boxed.store.following, TrailBox)
+
+        for bad in ['', '{"store": ', '{"store": null}}', '{"store": nul}', '{"store": null} {}']:
+            self.assertRaises(ValueError, lambda: load(io.StringIO(bad)))
+
+    @number("17.4")
+    def test_load_long_series(self):
+        from serialize import load
+
+        trail = Trail(None)
+        for i in range(20000):
+            trail = trail.add_mountain_before(Mountain(f"m{i}", 1, i))
+        text = serialize(trail)
+        loaded = load(io.StringIO(text))
+        walker = TopWalker()
+        loaded.follow_path(walker)
+        self.assertEqual(len(walker.mountains), 20000)
+        self.assertEqual(serialize(loaded), text)
+
+    @number("17.5")
+    def test_binary_round_trip(self):
+        import os
+        import tempfile
+        from serialize import dump_binary, load_binary, json_to_binary
+        from trail_interner import TrailInterner
+
+        rng = random.Random(1049)
+        for _ in range(30):
+            trail = self.random_trail(rng, 4)
+            out = io.BytesIO()
+            dump_binary(trail, out)
+            loaded = load_binary(io.BytesIO(out.getvalue()))
+            self.assertEqual(serialize(loaded), serialize(trail))
+
+        # Shared sub-trails stay shared.
+        shared = TrailInterner().intern(Trail(TrailSplit(self.random_trail(rng, 2), self.random_trail(rng, 2), Trail(None))))
+        shared = Trail(TrailSplit(shared, shared, Trail(None)))
+        out = io.BytesIO()
+        dump_binary(shared, out)
+        loaded = load_binary(io.BytesIO(out.getvalue()), TrailBox)
+        self.assertIs(loaded.store.path_top, loaded.store.path_bottom)
+        self.assertIsInstance(loaded.store.path_top, TrailBox)
+
+        self.assertRaises(ValueError, lambda: load_binary(io.BytesIO(b"TRAILJSN" + bytes(40))))
+        self.assertRaises(ValueError, lambda: load_binary(io.BytesIO(out.getvalue()[:-3])))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "basic.bin")
+            json_to_binary("stores/basic.json", path)
+            with open(path, "rb") as f, open("stores/basic.json") as g:
+                self.assertEqual(serialize(load_binary(f)), serialize(deserialize(json.load(g))))
+
+        trail = Trail(None)
+        for i in range(5000):
+            trail = trail.add_mountain_before(Mountain(f"m{i % 50}", 1, i))
+        out = io.BytesIO()
+        dump_binary(trail, out)
+        self.assertLess(len(out.getvalue()) * 5, len(serialize(trail)))
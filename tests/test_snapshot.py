@@ -0,0 +1,68 @@
+import os
+import random
+import tempfile
+import unittest
+from ed_utils.decorators import number
+
+from mountain import Mountain
+from mountain_manager import MountainManager
+from snapshot import save_snapshot, load_snapshot, snapshot_bytes, manager_from_buffer
+
+class TestSnapshot(unittest.TestCase):
+
+    def layout(self, manager):
+        result = []
+        for item in manager.mountain_table.outer_hash_table:
+            if item is None:
+                result.append(None)
+            else:
+                diff, inner = item
+                result.append((diff, inner.size_index, inner.count, list(inner.array)))
+        return result
+
+    def random_manager(self, secondary_indexes):
+        rng = random.Random(1045)
+        manager = MountainManager(secondary_indexes=secondary_indexes)
+        for _ in range(600):
+            mountain = Mountain(f"m{rng.randint(0, 80)}", rng.randint(0, 25), rng.randint(0, 50))
+            if rng.random() < 0.7:
+                manager.add_mountain(mountain)
+            else:
+                manager.remove_mountain(mountain)
+        return manager
+
+    @number("15.1")
+    def test_round_trip(self):
+        for secondary_indexes in (False, True):
+            manager = self.random_manager(secondary_indexes)
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "catalogue.snap")
+                save_snapshot(manager, path)
+                loaded = load_snapshot(path)
+
+            self.assertEqual(self.layout(loaded), self.layout(manager))
+            self.assertEqual(loaded.mountain_table.outer_size_index, manager.mountain_table.outer_size_index)
+            self.assertEqual(len(loaded.mountain_table), len(manager.mountain_table))
+            self.assertEqual(loaded.version, manager.version)
+            self.assertEqual(loaded.group_by_difficulty(), manager.group_by_difficulty())
+            if secondary_indexes:
+                self.assertEqual(loaded.mountains_in_length_range(10, 20), manager.mountains_in_length_range(10, 20))
+
+            # The restored tables keep working, hashes included.
+            for diff, group in enumerate(manager.group_by_difficulty()):
+                for mountain in group:
+                    self.assertEqual(loaded.mountain_table[mountain.difficulty_level, mountain.name], mountain)
+                    loaded.remove_mountain(mountain)
+                    manager.remove_mountain(mountain)
+                    break
+            extra = [Mountain(f"new{i}", i % 30, i) for i in range(200)]
+            for mountain in extra:
+                loaded.add_mountain(mountain)
+                manager.add_mountain(mountain)
+            self.assertEqual(self.layout(loaded), self.layout(manager))
+
+    @number("15.2")
+    def test_bad_snapshot(self):
+        self.assertRaises(ValueError, lambda: manager_from_buffer(b"not a snapshot at all, really not one"))
+        data = snapshot_bytes(MountainManager())
+        self.assertEqual(manager_from_buffer(data).group_by_difficulty(), [])
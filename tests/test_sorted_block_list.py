@@ -0,0 +1,78 @@
+import random
+import unittest
+from ed_utils.decorators import number
+
+from data_structures.sorted_block_list import BlockSortedList
+
+class TestBlockSortedList(unittest.TestCase):
+
+    @number("12.1")
+    def test_random_inserts(self):
+        rng = random.Random(1008)
+        items = [(rng.randint(0, 50), i) for i in range(500)]
+        bsl = BlockSortedList(key=lambda x: x[0], load=4)
+        for item in items:
+            bsl.add(item)
+
+        expected = sorted(items, key=lambda x: x[0])
+        self.assertEqual(len(bsl), 500)
+        self.assertListEqual(list(bsl), expected)
+        self.assertListEqual(list(bsl.keys()), [x[0] for x in expected])
+        for item in items:
+            self.assertEqual(bsl.index(item), [x[0] for x in expected].index(item[0]))
+        self.assertRaises(KeyError, lambda: bsl.index((51, 0)))
+
+    @number("12.2")
+    def test_from_sorted(self):
+        bsl = BlockSortedList.from_sorted(list(range(0, 100, 2)), load=3)
+        bsl.update([5, 99, -1])
+        self.assertListEqual(list(bsl), sorted(list(range(0, 100, 2)) + [5, 99, -1]))
+        self.assertEqual(bsl.index(5), 4)
+        self.assertEqual(bsl.index(99), 52)
+
+    @number("12.3")
+    def test_order_statistics(self):
+        rng = random.Random(1041)
+        items = list(range(300))
+        rng.shuffle(items)
+        bsl = BlockSortedList(load=4)
+        reference = []
+        for item in items:
+            bsl.add(item)
+            reference.append(item)
+        reference.sort()
+
+        for _ in range(200):
+            victim = rng.choice(reference)
+            reference.remove(victim)
+            bsl.remove(victim)
+            rank = rng.randrange(len(reference))
+            self.assertEqual(bsl[rank], reference[rank])
+            self.assertEqual(bsl.rank(reference[rank]), rank)
+
+        self.assertListEqual(list(bsl), reference)
+        self.assertEqual(bsl[-1], reference[-1])
+        self.assertRaises(IndexError, lambda: bsl[len(reference)])
+        self.assertRaises(KeyError, lambda: bsl.remove(-5))
+        self.assertEqual(bsl.bisect_key_left(reference[10]), 10)
+        self.assertEqual(bsl.bisect_key_right(reference[10]), 11)
+        self.assertListEqual([item for key, item in bsl.iter_from(95)], reference[95:])
+
+    @number("12.4")
+    def test_stream_build_and_drain(self):
+        items = list(range(0, 100, 2))
+        bsl = BlockSortedList.from_sorted_pairs(((item, item) for item in items), load=3)
+        self.assertEqual(len(bsl), 50)
+        self.assertListEqual(list(bsl), items)
+        self.assertEqual(bsl.index(40), 20)
+        bsl.add(41)
+        self.assertEqual(bsl.rank(42), 22)
+
+        blocks = bsl._blocks
+        drained = bsl.drain()
+        self.assertEqual(next(drained), (0, 0))
+        self.assertEqual(len(bsl), 0)
+        self.assertListEqual(list(bsl), [])
+        self.assertListEqual([item for _, item in drained], sorted(items + [41])[1:])
+        self.assertTrue(all(block is None for block in blocks))
+        self.assertEqual(len(BlockSortedList.from_sorted_pairs(iter([]))), 0)
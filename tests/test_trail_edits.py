@@ -111,4 +111,23 @@ class TestTrailMethods(unittest.TestCase):
         res = t.remove_branch()
         self.assertIsInstance(res, TrailSeries)
         self.assertEqual(res.mountain, m)
-        self.assertEqual(res.following.store, None)
\ No newline at end of file
+        self.assertEqual(res.following.store, None)
+
+    @number("1.5")
+    def test_edits_keep_node_type(self):
+        from draw_trails import TrailBox, TrailSeriesBox, TrailSplitBox
+
+        a, b = Mountain("a", 1, 1), Mountain("b", 2, 2)
+        t = TrailBox(TrailSeriesBox(a, TrailBox(None)))
+
+        res1 = t.add_empty_branch_before()
+        self.assertIsInstance(res1, TrailBox)
+        self.assertIsInstance(res1.store, TrailSplitBox)
+        self.assertIsInstance(res1.store.path_top, TrailBox)
+
+        res2 = t.store.add_mountain_after(b)
+        self.assertIsInstance(res2, TrailSeriesBox)
+        self.assertIsInstance(res2.following.store, TrailSeriesBox)
+
+        # Plain trail nodes are slotted and reject unknown attributes.
+        self.assertRaises(AttributeError, setattr, Trail(None), "trail_box", None)
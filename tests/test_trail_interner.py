@@ -0,0 +1,90 @@
+import unittest
+from ed_utils.decorators import number
+
+from mountain import Mountain
+from trail import Trail, TrailSeries, TrailSplit
+from trail_interner import TrailInterner
+
+class TestTrailInterner(unittest.TestCase):
+
+    def load_example(self):
+        self.top_top = Mountain("top-top", 5, 3)
+        self.top_bot = Mountain("top-bot", 3, 5)
+        self.top_mid = Mountain("top-mid", 4, 7)
+        self.bot_one = Mountain("bot-one", 2, 5)
+        self.bot_two = Mountain("bot-two", 0, 0)
+        self.final   = Mountain("final", 4, 4)
+        self.trail = Trail(TrailSplit(
+            Trail(TrailSplit(
+                Trail(TrailSeries(self.top_top, Trail(None))),
+                Trail(TrailSeries(self.top_bot, Trail(None))),
+                Trail(TrailSeries(self.top_mid, Trail(None))),
+            )),
+            Trail(TrailSeries(self.bot_one, Trail(TrailSplit(
+                Trail(TrailSeries(self.bot_two, Trail(None))),
+                Trail(None),
+                Trail(None),
+            )))),
+            Trail(TrailSeries(self.final, Trail(None)))
+        ))
+
+    @number("8.1")
+    def test_shared_structure(self):
+        self.load_example()
+        interner = TrailInterner()
+        first = interner.intern(self.trail)
+        second = interner.intern(Trail(TrailSeries(self.final, Trail(None))))
+
+        # The follow path of the example is structurally identical to the second trail.
+        self.assertIs(first.store.path_follow, second)
+        # Every empty trail collapses to one node.
+        self.assertIs(first.store.path_bottom.store.following.store.path_bottom, second.store.following)
+        self.assertIs(interner.intern(first), first)
+
+    @number("8.2")
+    def test_memoised_paths(self):
+        self.load_example()
+        interner = TrailInterner()
+        make_path_string = lambda mountain_list: ", ".join(map(lambda x: x.name, mountain_list))
+
+        self.assertEqual(interner.count_paths(self.trail), len(self.trail.collect_mountain_list()))
+        self.assertListEqual(
+            list(map(make_path_string, interner.collect_mountain_list(self.trail))),
+            list(map(make_path_string, self.trail.collect_mountain_list())),
+        )
+        self.assertSetEqual(set(map(make_path_string, interner.length_k_paths(self.trail, 3))), {
+            "top-top, top-mid, final",
+            "top-bot, top-mid, final",
+            "bot-one, bot-two, final"
+        })
+
+    @number("8.3")
+    def test_intern_mountains(self):
+        copy_a = Mountain("a", 1, 1)
+        copy_b = Mountain("a", 1, 1)
+        trail_a = Trail(TrailSeries(copy_a, Trail(None)))
+        trail_b = Trail(TrailSeries(copy_b, Trail(None)))
+
+        interner = TrailInterner()
+        self.assertIsNot(interner.intern(trail_a), interner.intern(trail_b))
+        interner = TrailInterner(intern_mountains=True)
+        self.assertIs(interner.intern(trail_a), interner.intern(trail_b))
+
+    @number("8.4")
+    def test_canonical_trails_not_walked_again(self):
+        self.load_example()
+        interner = TrailInterner()
+        root = interner.intern(self.trail)
+        self.assertIs(interner.intern(root), root)
+        self.assertEqual(interner.paths(root), interner.paths(self.trail))
+
+        # Series nodes below the root keep no path lists of their own.
+        series = root.store.path_bottom
+        self.assertIsInstance(series.store, TrailSeries)
+        self.assertNotIn(id(series), interner._paths)
+        self.assertIn(id(series.store.following), interner._paths)
+
+        # A canonical root is answered without touching its nodes again.
+        interner.count_paths(root)
+        root.store.path_top.store = None
+        self.assertEqual(interner.count_paths(root), 4)
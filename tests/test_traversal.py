@@ -58,4 +58,120 @@ class TestTrailMethods(unittest.TestCase):
         cw = CustomWalker()
         self.trail.follow_path(cw)
 
-        self.assertListEqual(cw.mountains, [self.bot_one, self.bot_two, self.final])
\ No newline at end of file
+        self.assertListEqual(cw.mountains, [self.bot_one, self.bot_two, self.final])
+
+    @number("2.3")
+    def test_follow_paths(self):
+        class CustomWalker(WalkerPersonality):
+            def __init__(self, choices) -> None:
+                super().__init__()
+                self.count = 0
+                self.choices = choices
+            def select_branch(self, top_branch: Trail, bottom_branch: Trail) -> bool:
+                self.count += 1
+                return self.choices[self.count - 1]
+
+        self.load_example()
+        make_walkers = lambda: [TopWalker(), BottomWalker(), LazyWalker(), CustomWalker([False, True]), CustomWalker([True, False])]
+        expected = make_walkers()
+        for walker in expected:
+            self.trail.follow_path(walker)
+
+        for walk_batch in [self.trail.follow_paths, self.trail.compile().follow_paths]:
+            actual = make_walkers()
+            walk_batch(actual)
+            self.assertListEqual([w.mountains for w in actual], [w.mountains for w in expected])
+
+
+    @number("2.4")
+    def test_reused_walker(self):
+        from trail_walker import TrailWalker
+
+        class NestedWalker(WalkerPersonality):
+            # Walks the top branch with a TopWalker on the same engine before choosing.
+            def __init__(self, engine) -> None:
+                super().__init__()
+                self.engine = engine
+                self.peeked = []
+            def select_branch(self, top_branch: Trail, bottom_branch: Trail) -> bool:
+                peek = TopWalker()
+                top_branch.follow_path(peek, self.engine)
+                self.peeked.append(peek.mountains)
+                return False
+
+        self.load_example()
+        engine = TrailWalker(capacity=1)
+        for _ in range(3):
+            tw = TopWalker()
+            self.trail.follow_path(tw, engine)
+            self.assertListEqual(tw.mountains, [self.top_top, self.top_mid, self.final])
+            self.assertEqual(engine.size, 0)
+
+        nw = NestedWalker(engine)
+        self.trail.follow_path(nw, engine)
+        self.assertListEqual(nw.mountains, [self.bot_one, self.final])
+        self.assertListEqual(nw.peeked, [[self.top_top, self.top_mid], [self.bot_two]])
+
+
+    @number("2.5")
+    def test_lookahead_walkers(self):
+        from branch_stats import BranchMemo
+        from personality import EasiestRouteWalker, ShortestBranchWalker
+
+        self.load_example()
+        memo = BranchMemo()
+        ew = EasiestRouteWalker(memo)
+        self.trail.follow_path(ew)
+        self.assertListEqual(ew.mountains, [self.bot_one, self.bot_two, self.final])
+
+        stats = memo.stats(self.trail.store.path_top)
+        self.assertEqual((stats.mountain_count, stats.total_length, stats.min_difficulty, stats.best_score), (3, 15, 3, 7))
+
+        # A second walker sharing the memo computes nothing new.
+        size = len(memo)
+        self.trail.follow_path(EasiestRouteWalker(memo))
+        self.assertEqual(len(memo), size)
+
+        hardest = EasiestRouteWalker(BranchMemo(maximise=True))
+        self.trail.follow_path(hardest)
+        self.assertListEqual(hardest.mountains, [self.top_top, self.top_mid, self.final])
+
+        sw = ShortestBranchWalker()
+        self.trail.follow_path(sw)
+        self.assertListEqual(sw.mountains, [self.bot_one, self.bot_two, self.final])
+
+
+    @number("2.6")
+    def test_recorders(self):
+        from recorders import CountRecorder, AggregateRecorder, RingRecorder, CallbackRecorder
+
+        self.load_example()
+        count, totals, ring, streamed = CountRecorder(), AggregateRecorder(), RingRecorder(2), []
+        walkers = [TopWalker(count), TopWalker(totals), TopWalker(ring), TopWalker(CallbackRecorder(streamed.append))]
+        for walker in walkers:
+            self.trail.follow_path(walker)
+
+        self.assertEqual(count.count, 3)
+        self.assertEqual((totals.count, totals.total_length, totals.total_difficulty, totals.max_difficulty), (3, 14, 13, 5))
+        self.assertListEqual(walkers[2].mountains, [self.top_mid, self.final])
+        self.assertListEqual(streamed, [self.top_top, self.top_mid, self.final])
+        self.assertRaises(AttributeError, lambda: walkers[0].mountains)
+        with self.assertRaisesRegex(AttributeError, "CountRecorder, which keeps no mountain list"):
+            walkers[0].mountains
+
+        # Assigning mountains, as subclasses and resets do, records into the assigned list.
+        kept = []
+        walkers[0].mountains = kept
+        self.trail.follow_path(walkers[0])
+        self.assertIs(walkers[0].mountains, kept)
+        self.assertListEqual(kept, [self.top_top, self.top_mid, self.final])
+        self.assertEqual(count.count, 3)
+
+        class ResetWalker(TopWalker):
+            def __init__(self) -> None:
+                super().__init__()
+                self.mountains = []
+
+        walker = ResetWalker()
+        self.trail.follow_path(walker)
+        self.assertListEqual(walker.mountains, [self.top_top, self.top_mid, self.final])
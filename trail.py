@@ -4,15 +4,18 @@ from dataclasses import dataclass
 import copy
 
 from mountain import Mountain
+from constants import SERIES_KIND, SPLIT_KIND
 from data_structures.linked_stack import LinkedStack
+from trail_walker import TrailWalker
 
 from typing import TYPE_CHECKING, Union
 
 # Avoid circular imports for typing.
 if TYPE_CHECKING:
     from personality import WalkerPersonality
+    from compiled_trail import CompiledTrail
 
-@dataclass
+@dataclass(slots=True)
 class TrailSplit:
     """
     A split in the trail.
@@ -26,6 +29,8 @@ class TrailSplit:
     path_bottom: Trail
     path_follow: Trail
 
+    KIND = SPLIT_KIND
+
     def remove_branch(self) -> TrailStore:
         """Removes the branch, should just leave the remaining following trail."""
 
@@ -34,7 +39,7 @@ class TrailSplit:
         return self.path_follow.store
 
 
-@dataclass
+@dataclass(slots=True)
 class TrailSeries:
     """
     A mountain, followed by the rest of the trail
@@ -46,6 +51,8 @@ class TrailSeries:
     mountain: Mountain
     following: Trail
 
+    KIND = SERIES_KIND
+
     def remove_mountain(self) -> TrailStore:
         """Removes the mountain at the beginning of this series."""
 
@@ -56,9 +63,9 @@ class TrailSeries:
     def add_mountain_before(self, mountain: Mountain) -> TrailStore:
         """Adds a mountain in series before the current one."""
 
-        temp_store = TrailSeries (
+        temp_store = self.SERIES(
                     mountain = mountain,
-                    following = Trail(store = self))
+                    following = self.TRAIL(store = self))
                     
         return temp_store
 
@@ -66,10 +73,10 @@ class TrailSeries:
     def add_empty_branch_before(self) -> TrailStore:
         """Adds an empty branch, where the current trailstore is now the following path."""
 
-        temp_store = TrailSplit(
-                        path_top = Trail(store = None), 
-                        path_bottom = Trail(store = None), 
-                        path_follow = Trail(store = self)
+        temp_store = self.SPLIT(
+                        path_top = self.TRAIL(store = None), 
+                        path_bottom = self.TRAIL(store = None), 
+                        path_follow = self.TRAIL(store = self)
                         ) 
 
         return temp_store
@@ -77,10 +84,10 @@ class TrailSeries:
     def add_mountain_after(self, mountain: Mountain) -> TrailStore:
         """Adds a mountain after the current mountain, but before the following trail."""
 
-        temp_store = TrailSeries(
+        temp_store = self.SERIES(
                         mountain = self.mountain, 
-                        following = Trail (store = 
-                                TrailSeries(
+                        following = self.TRAIL(store = 
+                                self.SERIES(
                                     mountain = mountain, 
                                     following = self.following
                                     )
@@ -92,11 +99,11 @@ class TrailSeries:
     def add_empty_branch_after(self) -> TrailStore:
         """Adds an empty branch after the current mountain, but before the following trail."""
 
-        temp_branch = TrailSeries(
+        temp_branch = self.SERIES(
                         mountain = self.mountain, 
-                        following = Trail(store = TrailSplit(
-                                        path_top = Trail(store = None), 
-                                        path_bottom = Trail(store = None), 
+                        following = self.TRAIL(store = self.SPLIT(
+                                        path_top = self.TRAIL(store = None), 
+                                        path_bottom = self.TRAIL(store = None), 
                                         path_follow = self.following
                                         )
                                     )
@@ -106,7 +113,7 @@ class TrailSeries:
 
 TrailStore = Union[TrailSplit, TrailSeries, None]
 
-@dataclass
+@dataclass(slots=True)
 class Trail:
 
     store: TrailStore = None
@@ -114,7 +121,7 @@ class Trail:
     def add_mountain_before(self, mountain: Mountain) -> Trail:
         """Adds a mountain before everything currently in the trail."""
 
-        temp_trail = Trail (store = TrailSeries(
+        temp_trail = self.TRAIL(store = self.SERIES(
                                 mountain = mountain, 
                                 following = self
                                 )
@@ -125,24 +132,49 @@ class Trail:
     def add_empty_branch_before(self) -> Trail:
         """Adds an empty branch before everything currently in the trail."""
 
-        temp_trail = Trail(store = TrailSplit(
-                                path_top = Trail(store = None), 
-                                path_bottom = Trail(store = None), 
+        temp_trail = self.TRAIL(store = self.SPLIT(
+                                path_top = self.TRAIL(store = None), 
+                                path_bottom = self.TRAIL(store = None), 
                                 path_follow = self
                                 )
                             )
         return temp_trail
 
 
-    def follow_path(self, personality: WalkerPersonality) -> None:
+    def compile(self) -> CompiledTrail:
+
+        """
+        - Lowers the trail into flat parallel arrays for fast repeated traversal
+        - See compiled_trail.CompiledTrail
+
+        Args:
+        - self
+
+        Raises:
+        - None
+
+        Returns:
+        - CompiledTrail
+
+        Complexity:
+        - Worst case: O(N) , where N is the number of nodes in the trail
+        - Best case: O(1) , when the trail is empty
+        """
+
+        from compiled_trail import CompiledTrail
+        return CompiledTrail(trail = self)
+
+
+    def follow_path(self, personality: WalkerPersonality, walker: TrailWalker|None = None) -> None:
 
         """
         - Follow a path and add mountains according to a personality
-        - It uses the function 'traverse_trail' to do so
+        - It uses a TrailWalker to do so; pass the same walker to reuse its stack across calls
         
         Args:
         - self
         - personality - of WalkerPersonality class
+        - walker - of TrailWalker class or None
         
         Raises:
         - None
@@ -151,24 +183,79 @@ class Trail:
         - None
 
         Complexity:
-        - Worst case: O(M * traverse_trail) , where M is length of the stack and traverse_trail is of Trail class
+        - Worst case: O(N) , where N is the number of nodes on the walked path
         - Best case: O(1)
         """
-        
 
-        temp_stack_follow : LinkedStack[Trail] = LinkedStack()
-        temp_new_trail : Trail = self
+        if walker is None:
+            walker = TrailWalker()
 
-        temp_stack_follow.push(temp_new_trail)
+        walker.walk(trail = self, personality = personality)
 
-        while not temp_stack_follow.is_empty():
+        return
 
-            temp_new_trail = temp_stack_follow.pop()
 
-            temp_new_trail.traverse_trail(stack = temp_stack_follow, personality = personality)
 
-        return
+    def follow_paths(self, personalities: list[WalkerPersonality]) -> None:
 
+        """
+        - Follows the trail with a whole population of personalities at once
+        - Each personality ends up with exactly the mountains (and select_branch calls) of follow_path
+        - Walkers travel together: series segments are walked once per group, and at every split
+          the group is partitioned into the walkers choosing the top and the bottom branch,
+          which merge back into one group for the following path
+
+        Args:
+        - self
+        - personalities - list of WalkerPersonality
+
+        Raises:
+        - None
+
+        Returns:
+        - None
+
+        Complexity:
+        - Worst case: O(N * W) , where N is the number of nodes in the trail and W the number of personalities
+        - Best case: O(W)
+        """
+
+        # Each entry is a trail still to walk and the group of walkers walking it.
+        temp_stack_follow : list[tuple[Trail, list[WalkerPersonality]]] = [(self, list(personalities))]
+
+        while len(temp_stack_follow) > 0:
+
+            temp_new_trail, walkers = temp_stack_follow.pop()
+
+            while len(walkers) > 0:
+                store = temp_new_trail.store
+                if store is None:
+                    break
+
+                # Dispatched on the KIND tag, as in TrailWalker.
+                if store.KIND == SERIES_KIND:
+                    for walker in walkers:
+                        walker.add_mountain(store.mountain)
+                    temp_new_trail = store.following
+
+                else:
+                    top_walkers : list[WalkerPersonality] = []
+                    bottom_walkers : list[WalkerPersonality] = []
+
+                    for walker in walkers:
+                        if walker.select_branch(store.path_top, store.path_bottom) == True:
+                            top_walkers.append(walker)
+                        else:
+                            bottom_walkers.append(walker)
+
+                    # Popped last: the whole group resumes together once both branches are done.
+                    temp_stack_follow.append((store.path_follow, walkers))
+                    temp_stack_follow.append((store.path_bottom, bottom_walkers))
+
+                    temp_new_trail = store.path_top
+                    walkers = top_walkers
+
+        return
 
 
     def collect_all_mountains(self) -> list[Mountain]:
@@ -357,4 +444,7 @@ class Trail:
         return temp_list
 
 
-
+# Node types built by the edit methods. Subclasses that carry extra fields (such as the
+# box classes in draw_trails) rebind these so edits keep producing nodes of their own kind.
+for _node_type in (Trail, TrailSeries, TrailSplit):
+    _node_type.TRAIL, _node_type.SERIES, _node_type.SPLIT = Trail, TrailSeries, TrailSplit
@@ -0,0 +1,375 @@
+from __future__ import annotations
+
+from mountain import Mountain
+from trail import Trail, TrailSeries, TrailSplit
+
+
+class TrailInterner:
+
+    """
+    Hash-conses trails so that structurally identical sub-trails are stored once.
+
+    Two sub-trails are identical when they have the same shape and hold the same
+    mountains. Mountains are compared by identity unless `intern_mountains` is set,
+    in which case mountains with equal (name, difficulty_level, length) are merged too.
+
+    Interned trails are shared between every trail that contains them, so they must
+    be treated as immutable: use the edit methods (which build new nodes) and intern
+    the result again, rather than assigning to `store`, `following` or `path_*`.
+
+    Path counts are memoised per canonical node, and path lists per canonical split or empty
+    node (and per trail asked for), so they are computed once and reused by every trail
+    sharing that node.
+    """
+
+    def __init__(self, intern_mountains: bool = False) -> None:
+
+        """
+        defining the magic method : __init__
+        - This initialises the hash-consing tables and the memo tables
+
+        Args:
+        - self
+        - intern_mountains - bool, merge mountains with equal fields (True) or keep them by identity (False)
+
+        Raises:
+        - None
+
+        Returns:
+        - None
+
+        Complexity:
+        - Worst case: O(1)
+        - Best case: O(1)
+        """
+
+        self.intern_mountains = intern_mountains
+        self._nodes : dict[tuple, Trail] = {}
+        self._mountains : dict[tuple, Mountain] = {}
+        self._path_counts : dict[int, int] = {}
+        self._paths : dict[int, tuple[tuple[Mountain, ...], ...]] = {}
+
+        self._empty : Trail = Trail(store = None)
+        self._nodes[("empty",)] = self._empty
+        # id -> node for every canonical node, so already canonical trails are not walked again.
+        self._canonical : dict[int, Trail] = {id(self._empty): self._empty}
+
+
+    def __len__(self) -> int:
+
+        """
+        Returns the number of distinct canonical trails held by the interner
+
+        Complexity:
+        - Worst case: O(1)
+        - Best case: O(1)
+        """
+
+        return len(self._nodes)
+
+
+    def intern(self, trail: Trail) -> Trail:
+
+        """
+        - Returns the canonical trail structurally identical to the input trail
+        - The input trail is not modified; missing canonical nodes are created on the way
+
+        Args:
+        - self
+        - trail - of Trail class
+
+        Raises:
+        - None
+
+        Returns:
+        - Trail - the canonical (shared) trail
+
+        Complexity:
+        - Worst case: O(N) , where N is the number of nodes in the input trail
+        - Best case: O(1) , when the trail is already canonical
+        """
+
+        # Post-order over an explicit stack, so long series do not hit the recursion limit.
+        canonical : dict[int, Trail] = {}
+        stack : list[tuple[Trail, bool]] = [(trail, False)]
+
+        while len(stack) > 0:
+            node, children_done = stack.pop()
+
+            if id(node) in canonical:
+                continue
+
+            if self._canonical.get(id(node)) is node:
+                # Already canonical, and so is everything below it.
+                canonical[id(node)] = node
+                continue
+
+            store = node.store
+
+            if store is None:
+                canonical[id(node)] = self._empty
+
+            elif not children_done:
+                stack.append((node, True))
+                if isinstance(store, TrailSeries):
+                    stack.append((store.following, False))
+                else:
+                    stack.append((store.path_follow, False))
+                    stack.append((store.path_bottom, False))
+                    stack.append((store.path_top, False))
+
+            elif isinstance(store, TrailSeries):
+                mountain = self._intern_mountain(store.mountain)
+                following = canonical[id(store.following)]
+                canonical[id(node)] = self._lookup(
+                    key = ("series", id(mountain), id(following)),
+                    build = lambda: Trail(store = TrailSeries(mountain = mountain, following = following))
+                    )
+
+            else:
+                top = canonical[id(store.path_top)]
+                bottom = canonical[id(store.path_bottom)]
+                follow = canonical[id(store.path_follow)]
+                canonical[id(node)] = self._lookup(
+                    key = ("split", id(top), id(bottom), id(follow)),
+                    build = lambda: Trail(store = TrailSplit(path_top = top, path_bottom = bottom, path_follow = follow))
+                    )
+
+        return canonical[id(trail)]
+
+
+    def count_paths(self, trail: Trail) -> int:
+
+        """
+        - Returns the number of distinct paths through the trail, memoised per canonical node
+
+        Args:
+        - self
+        - trail - of Trail class
+
+        Raises:
+        - None
+
+        Returns:
+        - int - the number of paths
+
+        Complexity:
+        - Worst case: O(N) , where N is the number of nodes in the input trail
+        - Best case: O(1) , when the trail is canonical and already memoised
+        """
+
+        root = self.intern(trail)
+
+        for node in self._post_order(root, self._path_counts):
+            store = node.store
+
+            if store is None:
+                self._path_counts[id(node)] = 1
+            elif isinstance(store, TrailSeries):
+                self._path_counts[id(node)] = self._path_counts[id(store.following)]
+            else:
+                self._path_counts[id(node)] = (self._path_counts[id(store.path_top)] + self._path_counts[id(store.path_bottom)]) * self._path_counts[id(store.path_follow)]
+
+        return self._path_counts[id(root)]
+
+
+    def paths(self, trail: Trail) -> tuple[tuple[Mountain, ...], ...]:
+
+        """
+        - Returns every path through the trail as a tuple of mountains, memoised per canonical node
+        - The result is shared with every trail containing the same canonical node, so it is immutable
+        - Only split and empty nodes (and the root asked for) keep their paths memoised, so series
+          chains do not each hold a copy; the memo still holds O(P * L) mountains per memoised node,
+          for as long as the interner lives (see clear_memo)
+
+        Args:
+        - self
+        - trail - of Trail class
+
+        Raises:
+        - None
+
+        Returns:
+        - A tuple of tuple of Mountain, in the same order as Trail.collect_mountain_list
+
+        Complexity:
+        - Worst case: O(N + P * L) , where N is the number of nodes in the input trail, P the number of paths and L the longest path
+        - Best case: O(1) , when the trail is canonical and already memoised
+        """
+
+        root = self.intern(trail)
+
+        for node in self._post_order(root, self._paths):
+            store = node.store
+
+            if store is None:
+                self._paths[id(node)] = ((),)
+            elif isinstance(store, TrailSplit):
+                follow_paths = self._series_paths(store.path_follow)
+                self._paths[id(node)] = tuple(
+                    branch_path + follow_path
+                    for branch_path in self._series_paths(store.path_top) + self._series_paths(store.path_bottom)
+                    for follow_path in follow_paths
+                    )
+
+        if id(root) not in self._paths:
+            self._paths[id(root)] = self._series_paths(root)
+        return self._paths[id(root)]
+
+
+    def collect_mountain_list(self, trail: Trail) -> list[list[Mountain]]:
+
+        """
+        - Memoised equivalent of Trail.collect_mountain_list, returning fresh lists the caller may modify
+
+        Args:
+        - self
+        - trail - of Trail class
+
+        Raises:
+        - None
+
+        Returns:
+        - A list of list of Mountain
+
+        Complexity:
+        - Worst case: O(paths) + O(P * L) , where P is the number of paths and L the longest path
+        - Best case: O(P * L)
+        """
+
+        return [list(path) for path in self.paths(trail)]
+
+
+    def length_k_paths(self, trail: Trail, k: int) -> list[list[Mountain]]:
+
+        """
+        - Memoised equivalent of Trail.length_k_paths
+
+        Args:
+        - self
+        - trail - of Trail class
+        - k - int, the number of mountains on each returned path
+
+        Raises:
+        - None
+
+        Returns:
+        - A list of list of Mountain
+
+        Complexity:
+        - Worst case: O(paths) + O(P * L) , where P is the number of paths and L the longest path
+        - Best case: O(P)
+        """
+
+        return [list(path) for path in self.paths(trail) if len(path) == k]
+
+
+    def clear_memo(self) -> None:
+
+        """
+        - Drops the memoised path counts and path lists, keeping the canonical nodes
+
+        Complexity:
+        - Worst case: O(1)
+        - Best case: O(1)
+        """
+
+        self._path_counts = {}
+        self._paths = {}
+
+
+    def _series_paths(self, node: Trail) -> tuple[tuple[Mountain, ...], ...]:
+
+        """
+        - Returns the paths of a canonical node whose first split or empty node is memoised,
+          prefixing the mountains of the series chain leading to it
+
+        Complexity:
+        - Worst case: O(S + P * L) , where S is the length of the chain, P the number of paths and L the longest path
+        - Best case: O(1) , when node is memoised
+        """
+
+        memoised = self._paths.get(id(node))
+        if memoised is not None:
+            return memoised
+
+        prefix : list[Mountain] = []
+        while isinstance(node.store, TrailSeries):
+            prefix.append(node.store.mountain)
+            node = node.store.following
+
+        prefix_tuple = tuple(prefix)
+        return tuple(prefix_tuple + path for path in self._paths[id(node)])
+
+
+    def _intern_mountain(self, mountain: Mountain) -> Mountain:
+
+        """
+        - Returns the canonical mountain, keeping a reference so its id stays valid
+
+        Complexity:
+        - Worst case: O(1)
+        - Best case: O(1)
+        """
+
+        if self.intern_mountains and mountain is not None:
+            key = ("mountain", mountain.name, mountain.difficulty_level, mountain.length)
+        else:
+            key = ("mountain", id(mountain))
+
+        if key not in self._mountains:
+            self._mountains[key] = mountain
+        return self._mountains[key]
+
+
+    def _lookup(self, key: tuple, build) -> Trail:
+
+        """
+        - Returns the canonical node for key, building it the first time it is seen
+
+        Complexity:
+        - Worst case: O(1)
+        - Best case: O(1)
+        """
+
+        if key not in self._nodes:
+            node = build()
+            self._nodes[key] = node
+            self._canonical[id(node)] = node
+        return self._nodes[key]
+
+
+    def _post_order(self, root: Trail, memo: dict) -> list[Trail]:
+
+        """
+        - Returns the canonical nodes below root (root included) that are not in memo, children first
+
+        Complexity:
+        - Worst case: O(N) , where N is the number of distinct nodes below root
+        - Best case: O(1) , when root is already memoised
+        """
+
+        order : list[Trail] = []
+        seen : set[int] = set()
+        stack : list[tuple[Trail, bool]] = [(root, False)]
+
+        while len(stack) > 0:
+            node, children_done = stack.pop()
+
+            if children_done:
+                order.append(node)
+                continue
+            if id(node) in memo or id(node) in seen:
+                continue
+            seen.add(id(node))
+
+            stack.append((node, True))
+            store = node.store
+            if isinstance(store, TrailSeries):
+                stack.append((store.following, False))
+            elif isinstance(store, TrailSplit):
+                stack.append((store.path_follow, False))
+                stack.append((store.path_bottom, False))
+                stack.append((store.path_top, False))
+
+        return order
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from constants import SERIES_KIND
+
+from typing import TYPE_CHECKING
+
+# Avoid circular imports for typing.
+if TYPE_CHECKING:
+    from trail import Trail
+    from personality import WalkerPersonality
+
+
+class TrailWalker:
+
+    """
+    Reusable traversal engine for Trail.follow_path.
+
+    The pending following paths are kept on a preallocated list used as a stack, so walking a
+    trail allocates nothing per branch, and the same walker can be reused for any number of walks.
+    Nodes are dispatched on their KIND tag rather than with isinstance checks.
+
+    Walks may nest (a personality's select_branch may itself walk a trail with the same walker):
+    every walk only uses the part of the stack above where it started.
+    A walker must not be shared between threads.
+    """
+
+    def __init__(self, capacity: int = 16) -> None:
+
+        """
+        defining the magic method : __init__
+        - Preallocates the stack
+
+        Args:
+        - self
+        - capacity - int, the initial number of stack slots, doubled whenever it runs out
+
+        Raises:
+        - None
+
+        Returns:
+        - None
+
+        Complexity:
+        - Worst case: O(capacity)
+        - Best case: O(capacity)
+        """
+
+        self.stack : list[Trail|None] = [None] * max(capacity, 1)
+        self.size = 0
+
+
+    def walk(self, trail: Trail, personality: WalkerPersonality) -> None:
+
+        """
+        - Follow a path and add mountains according to a personality, as Trail.follow_path does
+
+        Args:
+        - self
+        - trail - of Trail class
+        - personality - of WalkerPersonality class
+
+        Raises:
+        - None
+
+        Returns:
+        - None
+
+        Complexity:
+        - Worst case: O(N) , where N is the number of nodes on the walked path
+        - Best case: O(1)
+        """
+
+        add_mountain = personality.add_mountain
+        select_branch = personality.select_branch
+        stack = self.stack
+        base = top = self.size
+        node = trail
+
+        try:
+            while True:
+                store = node.store
+
+                if store is None:
+                    if top == base:
+                        break
+                    top -= 1
+                    node = stack[top]
+                    stack[top] = None
+
+                elif store.KIND == SERIES_KIND:
+                    add_mountain(store.mountain)
+                    node = store.following
+
+                else:
+                    if top == len(stack):
+                        stack.extend([None] * len(stack))
+                    stack[top] = store.path_follow
+                    top += 1
+
+                    # Published before select_branch, so a nested walk starts above our entries.
+                    self.size = top
+                    if select_branch(store.path_top, store.path_bottom):
+                        node = store.path_top
+                    else:
+                        node = store.path_bottom
+        finally:
+            for index in range(base, top):
+                stack[index] = None
+            self.size = base